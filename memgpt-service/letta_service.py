@@ -1563,6 +1563,15 @@ if __name__ == "__main__":
             server = uvicorn.Server(config)
             await server.serve()
         
+        # Install uvloop before asyncio.run creates the loop; uvicorn's
+        # loop="uvloop" setting only applies when uvicorn owns loop
+        # creation, which it doesn't under server.serve()
+        try:
+            import uvloop
+            uvloop.install()
+        except ImportError:
+            print("uvloop not installed, using default asyncio loop")
+
         # Run everything in the event loop
         asyncio.run(start_service())
         
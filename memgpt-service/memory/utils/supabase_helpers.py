@@ -1,15 +1,18 @@
 # memgpt-service/memory/utils/supabase_helpers.py
 
+import asyncio
 import logging
 from typing import Tuple, Any
 from postgrest import APIError
 
 async def safe_supabase_execute(query, error_message="Failed to execute query") -> Tuple[bool, Any]:
-    """Execute a Supabase query safely without awaiting"""
+    """Execute a Supabase query safely off the event loop"""
     try:
-        # Execute without await
-        response = query.execute()
-        
+        # The sync client blocks on HTTP inside execute(); run it in the
+        # default executor so the event loop keeps serving other coroutines
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(None, query.execute)
+
         # Check for errors using hasattr to avoid attribute errors
         if hasattr(response, 'error') and response.error:
             logging.error(f"{error_message}: {response.error}")
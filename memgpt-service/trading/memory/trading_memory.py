@@ -6,15 +6,43 @@ from decimal import Decimal
 from dataclasses import dataclass
 from memory_base import Memory
 from ..risk_helpers import RiskHelpers
+from ..utils.timeutils import fast_iso
+import asyncio
 import json
 import logging
+import os
+import time
 from memory.utils.supabase_helpers import handle_supabase_response, safe_supabase_execute
 
+try:
+    import asyncpg
+except ImportError:
+    asyncpg = None
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
+def _dumps_pair(params, result):
+    """Serialize the params/result payloads (runs in the executor)"""
+    return json.dumps(params), json.dumps(result)
+
+
+def _to_decimal(value) -> Optional[Decimal]:
+    """Decimal for asyncpg numeric binds; None for absent/'None' amounts"""
+    if value in (None, 'None', ''):
+        return None
+    return Decimal(str(value))
+
+
+def _to_datetime(value) -> datetime:
+    """datetime for asyncpg timestamptz binds, parsing ISO strings"""
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
+
+
 @dataclass
 class TradingState:
     """Current trading state including performance and risk metrics"""
@@ -28,14 +56,109 @@ class TradingState:
     consciousness_state: Dict[str, Any]
 
 class TradingMemory:
+    # Column order for the prepared trade_executions INSERT
+    TRADE_EXECUTION_COLUMNS = (
+        'id', 'params', 'result', 'signature', 'timestamp', 'status',
+        'error', 'token_in', 'token_out', 'amount_in', 'amount_out', 'tx_hash'
+    )
+
     def __init__(self, supabase_client):
         self.supabase = supabase_client
         self.realtime_monitor = None
 
+        # Optional direct-Postgres fast path: a prepared INSERT reused across
+        # calls avoids re-parsing/planning the statement per trade
+        self._pg_dsn = os.getenv('SUPABASE_DB_URL')
+        self._pg_conn = None
+        self._pg_insert_stmt = None
+
+        # Monitor notifications are queued and dispatched by a background
+        # task so the insert path returns as soon as the row is committed
+        self._notify_q: Optional[asyncio.Queue] = None
+        self._notify_task = None
+
+        # Dashboard poll cache for get_trade_history, keyed by limit and
+        # invalidated whenever a new trade execution lands through this
+        # class. The TTL covers writers that bypass it (the realtime
+        # monitor's batched flush inserts into the same table without
+        # bumping the version counter)
+        self._history_cache: Dict[int, tuple] = {}
+        self._history_version = 0
+        self._history_cache_ttl = 5.0
+
+    def _queue_monitor_notification(self, execution_data: dict) -> None:
+        """Queue a realtime monitor notification without blocking the caller"""
+        if not self.realtime_monitor:
+            return
+
+        if self._notify_q is None:
+            self._notify_q = asyncio.Queue(maxsize=10_000)
+            self._notify_task = asyncio.create_task(self._notify_loop())
+
+        try:
+            self._notify_q.put_nowait(execution_data)
+        except asyncio.QueueFull:
+            # Drop the oldest notification rather than stalling inserts
+            try:
+                self._notify_q.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+            self._notify_q.put_nowait(execution_data)
+            logging.warning("Notification queue full, dropped oldest trade execution")
+
+    async def _notify_loop(self):
+        """Dispatch queued trade executions to the realtime monitor"""
+        while True:
+            execution_data = await self._notify_q.get()
+            try:
+                await self.realtime_monitor.process_trade_execution(execution_data)
+            except Exception as e:
+                logging.error(f"Error notifying realtime monitor: {str(e)}")
+
+    async def _get_prepared_insert(self):
+        """Lazily prepare the trade_executions INSERT on a direct PG connection"""
+        if asyncpg is None or not self._pg_dsn:
+            return None
+
+        try:
+            if self._pg_conn is None or self._pg_conn.is_closed():
+                self._pg_conn = await asyncpg.connect(self._pg_dsn)
+                self._pg_insert_stmt = None
+
+            if self._pg_insert_stmt is None:
+                columns = ', '.join(self.TRADE_EXECUTION_COLUMNS)
+                placeholders = ', '.join(
+                    f'${i + 1}' for i in range(len(self.TRADE_EXECUTION_COLUMNS))
+                )
+                self._pg_insert_stmt = await self._pg_conn.prepare(
+                    f"INSERT INTO trade_executions ({columns}) "
+                    f"VALUES ({placeholders}) RETURNING id"
+                )
+
+            return self._pg_insert_stmt
+
+        except Exception as e:
+            logging.warning(f"Prepared insert unavailable, using Supabase client: {str(e)}")
+            return None
+
     def set_realtime_monitor(self, monitor):
         """Set the realtime monitor instance"""
         self.realtime_monitor = monitor
 
+    @staticmethod
+    def _pg_bind_row(execution_data: Dict[str, Any]) -> tuple:
+        """Bind values for the prepared INSERT, in TRADE_EXECUTION_COLUMNS order.
+
+        asyncpg's binary protocol wants native types — a datetime for the
+        timestamptz column and Decimal/None for the numeric amounts — where
+        the PostgREST path coerces the string forms itself.
+        """
+        row = dict(execution_data)
+        row['timestamp'] = _to_datetime(row['timestamp'])
+        row['amount_in'] = _to_decimal(row['amount_in'])
+        row['amount_out'] = _to_decimal(row['amount_out'])
+        return tuple(row[col] for col in TradingMemory.TRADE_EXECUTION_COLUMNS)
+
     async def store_trade_execution(self, data: dict) -> None:
         """Store trade execution data"""
         try:
@@ -46,18 +169,25 @@ class TradingMemory:
                 data = json.loads(data)
             
             # Extract trade_id and params from nested structure if needed
-            trade_id = data.get('trade_id') or data.get('result', {}).get('trade_id')
+            result_payload = data.get('result', {})
+            trade_id = data.get('trade_id') or result_payload.get('trade_id')
             params = data.get('params') or data.get('data') or {}
-            
+
+            # Serialize potentially large payloads off the event loop so big
+            # trade results don't stall other coroutines
+            params_blob, result_blob = await asyncio.get_running_loop().run_in_executor(
+                None, _dumps_pair, params, result_payload
+            )
+
             # Build execution data from various possible structures
             execution_data = {
                 'id': trade_id,
-                'params': json.dumps(params),
-                'result': json.dumps(data.get('result', {})),
+                'params': params_blob,
+                'result': result_blob,
                 'signature': data.get('signature'),
-                'timestamp': data.get('timestamp') or datetime.now().isoformat(),
+                'timestamp': data.get('timestamp') or fast_iso(),
                 'status': data.get('status', 'completed' if data.get('signature') else 'failed'),
-                'error': data.get('result', {}).get('error'),
+                'error': result_payload.get('error'),
                 'token_in': data.get('tokenIn'),
                 'token_out': data.get('tokenOut'),
                 'amount_in': str(data.get('amountIn')),
@@ -71,9 +201,27 @@ class TradingMemory:
             if not execution_data['params']:
                 raise ValueError("Missing params in execution data")
             
-            # Log the execution data being stored
-            logging.info(f"Storing trade execution: {json.dumps(execution_data, default=str)}")
-            
+            # Log a summary rather than re-serializing the full payload
+            logging.info(
+                f"Storing trade execution {trade_id} (status={execution_data['status']})"
+            )
+
+            # Fast path: reuse the prepared statement when direct PG is
+            # configured; any bind/execution failure falls through to the
+            # Supabase client below
+            stmt = await self._get_prepared_insert()
+            if stmt is not None:
+                try:
+                    result = await stmt.fetchval(*self._pg_bind_row(execution_data))
+                    logging.info(f"Successfully stored trade execution with ID: {trade_id}")
+                    self._history_version += 1
+                    self._queue_monitor_notification(execution_data)
+                    return result
+                except Exception as e:
+                    logging.warning(
+                        f"Prepared insert failed, using Supabase client: {str(e)}"
+                    )
+
             # Create the insert query WITHOUT executing it
             query = self.supabase.table('trade_executions').insert(execution_data)
             
@@ -85,11 +233,11 @@ class TradingMemory:
                 raise Exception(f"Failed to store trade execution: {result}")
             
             logging.info(f"Successfully stored trade execution with ID: {trade_id}")
-            
-            # Remove realtime monitor notification since it's not implemented
-            # if self.realtime_monitor:
-            #     await self.realtime_monitor.process_trade_execution(execution_data)
-            
+            self._history_version += 1
+
+            # Notify the realtime monitor off the insert path
+            self._queue_monitor_notification(execution_data)
+
             return result
             
         except Exception as e:
@@ -97,9 +245,64 @@ class TradingMemory:
             logging.error(f"Trade data: {json.dumps(data, default=str)}")
             raise
 
+    async def bulk_copy_trade_executions(self, rows: List[Dict[str, Any]]) -> int:
+        """Bulk-load trade executions via Postgres COPY (backfill/replay only).
+
+        Streams records through COPY instead of per-row INSERTs, skipping
+        per-row parse/plan entirely. Not for the online single-trade path.
+        """
+        if not rows:
+            return 0
+
+        if asyncpg is None or not self._pg_dsn:
+            raise RuntimeError(
+                "bulk_copy_trade_executions requires asyncpg and SUPABASE_DB_URL"
+            )
+
+        if self._pg_conn is None or self._pg_conn.is_closed():
+            self._pg_conn = await asyncpg.connect(self._pg_dsn)
+            self._pg_insert_stmt = None
+
+        def iter_records():
+            # COPY shares asyncpg's binary codecs with the prepared
+            # insert, so the same native-type binds apply here
+            for row in rows:
+                params = row.get('params')
+                result = row.get('result')
+                yield (
+                    row.get('id'),
+                    params if isinstance(params, str) else json.dumps(params or {}),
+                    result if isinstance(result, str) else json.dumps(result or {}),
+                    row.get('signature'),
+                    _to_datetime(row.get('timestamp') or fast_iso()),
+                    row.get('status', 'completed'),
+                    row.get('error'),
+                    row.get('token_in'),
+                    row.get('token_out'),
+                    _to_decimal(row.get('amount_in')),
+                    _to_decimal(row.get('amount_out')),
+                    row.get('tx_hash')
+                )
+
+        await self._pg_conn.copy_records_to_table(
+            'trade_executions',
+            records=iter_records(),
+            columns=list(self.TRADE_EXECUTION_COLUMNS)
+        )
+
+        logging.info(f"Bulk-copied {len(rows)} trade executions")
+        self._history_version += 1
+        return len(rows)
+
     async def get_trade_history(self, limit: int = 10):
         """Get trade execution history"""
         try:
+            # Repeated dashboard polls between trades hit the cache
+            cached = self._history_cache.get(limit)
+            if (cached is not None and cached[0] == self._history_version
+                    and time.monotonic() - cached[1] < self._history_cache_ttl):
+                return cached[2]
+
             # Use safe_supabase_execute helper
             success, result = await safe_supabase_execute(
                 self.supabase.table('trade_executions')\
@@ -112,7 +315,8 @@ class TradingMemory:
             if not success:
                 logging.error(f"Error getting trade history: {result}")
                 return []
-                
+
+            self._history_cache[limit] = (self._history_version, time.monotonic(), result)
             return result
             
         except Exception as e:
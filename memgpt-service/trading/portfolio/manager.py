@@ -3,13 +3,18 @@ Portfolio Manager for Solana trading.
 Manages positions, risk, and portfolio optimization.
 """
 from typing import Dict, Any, List, Optional, Tuple
+from collections import deque
 from decimal import Decimal
 from datetime import datetime
+import asyncio
+import logging
 import pandas as pd
 import numpy as np
 from dataclasses import dataclass
 from enum import Enum
 from .risk_calculator import RiskCalculator, RiskMetrics, PositionRisk
+from ..utils.timeutils import fast_iso
+from ..utils.numutils import parse_decimal
 
 class PortfolioStatus(Enum):
     HEALTHY = "healthy"
@@ -47,28 +52,50 @@ class Position:
 
 class PortfolioManager:
     """Manages trading portfolio and risk"""
-    
+
+    # Violation bitmask -> rejection reason, first set bit wins
+    _VALIDATION_REASONS = (
+        (1, "Insufficient balance"),
+        (2, "Exceeds position size limit"),
+        (4, "Exceeds portfolio value limit"),
+    )
+
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.risk_calculator = RiskCalculator(config.get("risk", {}))
         
         # Initialize portfolio state
         self.positions: Dict[str, Position] = {}
-        self.balance = Decimal(str(config.get("initial_balance", "0")))
+        self.balance = parse_decimal(config.get("initial_balance", "0"))
         self.realized_pnl = Decimal("0")
         
-        # Performance tracking
-        self.performance_history: List[PortfolioMetrics] = []
+        # Performance tracking; bounded so long runs don't grow without limit
+        self.performance_history: deque = deque(
+            maxlen=config.get("history_len", 100_000)
+        )
         self.trade_history: List[Dict[str, Any]] = []
         
         # Risk limits
-        self.max_position_value = Decimal(str(config.get("max_position_value", "1000")))
-        self.max_portfolio_value = Decimal(str(config.get("max_portfolio_value", "10000")))
+        self.max_position_value = parse_decimal(config.get("max_position_value", "1000"))
+        self.max_portfolio_value = parse_decimal(config.get("max_portfolio_value", "10000"))
         self.max_drawdown = float(config.get("max_drawdown", 0.2))
-        
+
+        # Status thresholds are fixed at construction; precompute the floats
+        # so _determine_portfolio_status avoids config lookups per tick
+        initial_balance = float(config.get("initial_balance", "0"))
+        self._critical_value_floor = initial_balance * (1 - self.max_drawdown)
+        self._max_var = float(config.get("max_var", 0.1))
+        self._warning_var = float(config.get("warning_var", 0.05))
+
         # Initialize metrics
         self.last_metrics: Optional[PortfolioMetrics] = None
-        
+
+        # Packed float64 buffers for the vectorized exit-condition scan
+        self._exit_capacity = 0
+        self._exit_price = np.empty(0)
+        self._exit_sl = np.empty(0)
+        self._exit_tp = np.empty(0)
+
     async def update_portfolio(self, market_data: Dict[str, Dict[str, Any]]):
         """Update portfolio state and metrics"""
         try:
@@ -138,7 +165,7 @@ class PortfolioManager:
                 "side": side,
                 "size": str(size),
                 "price": str(price),
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": fast_iso(),
                 "metadata": metadata
             }
             self.trade_history.append(trade_record)
@@ -151,31 +178,50 @@ class PortfolioManager:
             
     async def _update_positions(self, market_data: Dict[str, Dict[str, Any]]):
         """Update position values and metrics"""
+        # Bind hot lookups to locals; the loop runs per position per tick
+        calculate_position_risk = self.risk_calculator.calculate_position_risk
+
+        tasks = []
+        updated = []
         for token_address, position in self.positions.items():
-            if token_address not in market_data:
+            md = market_data.get(token_address)
+            if md is None:
                 continue
-                
-            current_price = Decimal(str(market_data[token_address]["price"]))
-            
+
+            size = position.size
+            entry_price = position.entry_price
+            current_price = parse_decimal(md["price"])
+
             # Update position state
             position.current_price = current_price
-            position.unrealized_pnl = (
-                current_price - position.entry_price
-            ) * position.size
-            
-            # Update risk metrics
-            position.risk_metrics = await self.risk_calculator.calculate_position_risk(
+            position.unrealized_pnl = (current_price - entry_price) * size
+
+            tasks.append(calculate_position_risk(
                 token_address,
                 {
-                    "size": position.size,
-                    "entry_price": position.entry_price
+                    "size": size,
+                    "entry_price": entry_price
                 },
-                market_data[token_address]
-            )
-            
-            # Check stop loss / take profit
-            await self._check_exit_conditions(position, current_price)
-            
+                md
+            ))
+            updated.append(position)
+
+        # Risk updates are independent per token; run them concurrently and
+        # keep the tick alive even if individual tokens fail
+        if tasks:
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            for position, result in zip(updated, results):
+                if isinstance(result, Exception):
+                    logging.error(
+                        f"Position risk update failed for "
+                        f"{position.token_address}: {str(result)}"
+                    )
+                    continue
+                position.risk_metrics = result
+
+        # Check stop loss / take profit across all positions in one pass
+        await self._check_exit_conditions()
+
     async def _calculate_portfolio_metrics(
         self,
         risk_metrics: RiskMetrics
@@ -236,44 +282,36 @@ class PortfolioManager:
     ) -> Dict[str, Any]:
         """Validate trade against portfolio constraints"""
         try:
-            # Calculate trade value
             trade_value = size * price
-            
-            # Check balance
-            if side == "buy" and trade_value > self.balance:
-                return {
-                    "valid": False,
-                    "reason": "Insufficient balance"
-                }
-                
-            # Check position limits
-            if side == "buy":
-                if token_address in self.positions:
-                    new_size = self.positions[token_address].size + size
-                else:
-                    new_size = size
-                    
-                if new_size * price > self.max_position_value:
-                    return {
-                        "valid": False,
-                        "reason": "Exceeds position size limit"
-                    }
-                    
-            # Check portfolio value limit
-            new_portfolio_value = sum(
-                p.size * p.current_price for p in self.positions.values()
-            )
-            if side == "buy":
-                new_portfolio_value += trade_value
-                
-            if new_portfolio_value > self.max_portfolio_value:
-                return {
-                    "valid": False,
-                    "reason": "Exceeds portfolio value limit"
-                }
-                
-            return {"valid": True}
-            
+            side_is_buy = side == "buy"
+
+            # Single pass over positions collects both the held size for this
+            # token and the current portfolio value
+            held_size = Decimal("0")
+            portfolio_value = Decimal("0")
+            for token, position in self.positions.items():
+                portfolio_value += position.size * position.current_price
+                if token == token_address:
+                    held_size = position.size
+
+            violations = 0
+            if side_is_buy:
+                if trade_value > self.balance:
+                    violations |= 1
+                if (held_size + size) * price > self.max_position_value:
+                    violations |= 2
+                portfolio_value += trade_value
+
+            if portfolio_value > self.max_portfolio_value:
+                violations |= 4
+
+            if not violations:
+                return {"valid": True}
+
+            for bit, reason in self._VALIDATION_REASONS:
+                if violations & bit:
+                    return {"valid": False, "reason": reason}
+
         except Exception as e:
             return {
                 "valid": False,
@@ -345,23 +383,56 @@ class PortfolioManager:
         # Update balance
         self.balance += size * price + pnl
         
-    async def _check_exit_conditions(self, position: Position, current_price: Decimal):
-        """Check stop loss and take profit conditions"""
-        if position.stop_loss and current_price <= position.stop_loss:
-            await self._close_position(
-                position.token_address,
-                position.size,
-                current_price,
-                {"exit_reason": "stop_loss"}
-            )
-            
-        elif position.take_profit and current_price >= position.take_profit:
-            await self._close_position(
-                position.token_address,
-                position.size,
-                current_price,
-                {"exit_reason": "take_profit"}
-            )
+    async def _check_exit_conditions(self):
+        """Check stop loss and take profit conditions for all positions.
+
+        Prices and thresholds are packed into float64 buffers so a single
+        vectorized compare finds the (usually empty) set of triggered
+        positions; only those pay for Decimal math and position closing.
+        """
+        count = len(self.positions)
+        if count == 0:
+            return
+
+        # Grow buffers geometrically to avoid per-tick reallocation
+        if count > self._exit_capacity:
+            self._exit_capacity = max(count * 2, 16)
+            self._exit_price = np.empty(self._exit_capacity)
+            self._exit_sl = np.empty(self._exit_capacity)
+            self._exit_tp = np.empty(self._exit_capacity)
+
+        tokens = list(self.positions.keys())
+        for i, token in enumerate(tokens):
+            position = self.positions[token]
+            self._exit_price[i] = float(position.current_price)
+            # +/-inf marks "no threshold" so the compares never trigger
+            self._exit_sl[i] = float(position.stop_loss) if position.stop_loss else -np.inf
+            self._exit_tp[i] = float(position.take_profit) if position.take_profit else np.inf
+
+        prices = self._exit_price[:count]
+        sl_hits = np.where(prices <= self._exit_sl[:count])[0]
+        tp_hits = np.where(prices >= self._exit_tp[:count])[0]
+
+        for idx in sl_hits:
+            position = self.positions.get(tokens[idx])
+            if position:
+                await self._close_position(
+                    position.token_address,
+                    position.size,
+                    position.current_price,
+                    {"exit_reason": "stop_loss"}
+                )
+
+        for idx in tp_hits:
+            # Stop loss takes precedence; skip positions already closed above
+            position = self.positions.get(tokens[idx])
+            if position:
+                await self._close_position(
+                    position.token_address,
+                    position.size,
+                    position.current_price,
+                    {"exit_reason": "take_profit"}
+                )
             
     async def _check_risk_limits(self, metrics: PortfolioMetrics):
         """Check and handle risk limit breaches"""
@@ -371,31 +442,45 @@ class PortfolioManager:
             
     async def _reduce_risk(self):
         """Implement risk reduction measures"""
-        # Sort positions by risk contribution
-        positions_by_risk = sorted(
-            self.positions.items(),
-            key=lambda x: x[1].risk_metrics.risk_contribution,
-            reverse=True
-        )
-        
-        # Close riskiest positions first
-        for token_address, position in positions_by_risk:
-            await self._close_position(
-                token_address,
-                position.size,
-                position.current_price,
-                {"exit_reason": "risk_reduction"}
+        batch = self.config.get("risk_reduction_batch", 5)
+
+        while self.positions:
+            tokens = list(self.positions.keys())
+            contribs = np.fromiter(
+                (self.positions[t].risk_metrics.risk_contribution for t in tokens),
+                dtype=np.float64,
+                count=len(tokens)
             )
-            
-            # Check if we're back within limits
-            metrics = await self._calculate_portfolio_metrics(
-                await self.risk_calculator.calculate_portfolio_risk(
-                    self.positions,
-                    {}  # Market data would be needed here
+
+            # Select the top-k riskiest via argpartition (O(N)) instead of
+            # sorting the whole position list
+            k = min(len(tokens), batch)
+            top = np.argpartition(contribs, -k)[-k:]
+            top = top[np.argsort(-contribs[top])]
+
+            recovered = False
+            for idx in top:
+                position = self.positions[tokens[idx]]
+                await self._close_position(
+                    position.token_address,
+                    position.size,
+                    position.current_price,
+                    {"exit_reason": "risk_reduction"}
                 )
-            )
-            
-            if metrics.status != PortfolioStatus.CRITICAL:
+
+                # Check if we're back within limits
+                metrics = await self._calculate_portfolio_metrics(
+                    await self.risk_calculator.calculate_portfolio_risk(
+                        self.positions,
+                        {}  # Market data would be needed here
+                    )
+                )
+
+                if metrics.status != PortfolioStatus.CRITICAL:
+                    recovered = True
+                    break
+
+            if recovered:
                 break
                 
     def _determine_portfolio_status(
@@ -405,19 +490,21 @@ class PortfolioManager:
         daily_return: float
     ) -> PortfolioStatus:
         """Determine portfolio health status"""
+        value_at_risk = risk_metrics.value_at_risk
+
         if (
-            float(total_value) < float(self.config["initial_balance"]) * (1 - self.max_drawdown) or
-            risk_metrics.value_at_risk > self.config.get("max_var", 0.1) or
+            float(total_value) < self._critical_value_floor or
+            value_at_risk > self._max_var or
             daily_return < -0.1  # 10% daily loss
         ):
             return PortfolioStatus.CRITICAL
-            
+
         elif (
-            risk_metrics.value_at_risk > self.config.get("warning_var", 0.05) or
+            value_at_risk > self._warning_var or
             daily_return < -0.05  # 5% daily loss
         ):
             return PortfolioStatus.WARNING
-            
+
         return PortfolioStatus.HEALTHY
         
     def get_portfolio_summary(self) -> Dict[str, Any]:
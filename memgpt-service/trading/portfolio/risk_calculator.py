@@ -3,11 +3,70 @@ Risk calculator for portfolio management.
 Handles risk metrics, exposure calculations, and position sizing.
 """
 from typing import Dict, Any, List, Optional, Tuple
+from collections import deque
 from dataclasses import dataclass
 from datetime import datetime, timedelta
+import logging
+import time
 import numpy as np
 from decimal import Decimal
-import pandas as pd
+from . import risk_kernels
+from ..utils.numutils import parse_decimal
+
+log = logging.getLogger(__name__)
+
+# SOL is the fixed market proxy for beta calculations
+SOL_MINT = "So11111111111111111111111111111111111111112"
+
+class _TokenPriceHistory:
+    """Fixed-size ring buffer of prices/timestamps for one token.
+
+    Inserts are O(1) with zero allocation; once the buffer is full, new
+    samples implicitly overwrite the oldest, so no per-tick pruning or
+    reallocation is needed at all.
+    """
+    __slots__ = ("prices", "ts_ns", "head", "count", "_min_val", "_min_dirty")
+
+    def __init__(self, capacity: int):
+        self.prices = np.empty(capacity, dtype=np.float64)
+        self.ts_ns = np.empty(capacity, dtype=np.int64)
+        self.head = 0
+        self.count = 0
+        self._min_val = np.inf
+        self._min_dirty = False
+
+    def append(self, price: float, ts_ns: int):
+        cap = self.prices.shape[0]
+        evicting = self.count == cap
+
+        # Only a full rescan can replace an evicted minimum; defer it until
+        # the min is actually read again
+        if evicting and self.prices[self.head] <= self._min_val:
+            self._min_dirty = True
+
+        self.prices[self.head] = price
+        self.ts_ns[self.head] = ts_ns
+        self.head = (self.head + 1) % cap
+        if not evicting:
+            self.count += 1
+
+        if not self._min_dirty and price < self._min_val:
+            self._min_val = price
+
+    @property
+    def min_price(self) -> float:
+        """Minimum price in the window, maintained incrementally"""
+        if self._min_dirty:
+            self._min_val = float(self.view().min()) if self.count else np.inf
+            self._min_dirty = False
+        return self._min_val
+
+    def view(self) -> np.ndarray:
+        """Contiguous logical view, oldest sample first"""
+        if self.count < self.prices.shape[0]:
+            return self.prices[:self.count]
+        head = self.head
+        return np.concatenate((self.prices[head:], self.prices[:head]))
 
 @dataclass
 class RiskMetrics:
@@ -18,9 +77,19 @@ class RiskMetrics:
     max_drawdown: float
     beta: float
     volatility: float
-    correlation_matrix: Optional[pd.DataFrame]
+    # (tokens, K x K matrix); kept label-free so the hot path never touches
+    # pandas — call corr_dataframe() when labeled output is actually needed
+    correlation_matrix: Optional[Tuple[List[str], np.ndarray]]
     timestamp: datetime
 
+    def corr_dataframe(self):
+        """Correlation matrix as a labeled DataFrame (imports pandas lazily)"""
+        if self.correlation_matrix is None:
+            return None
+        import pandas as pd
+        tokens, corr = self.correlation_matrix
+        return pd.DataFrame(corr, index=tokens, columns=tokens)
+
 @dataclass
 class PositionRisk:
     """Individual position risk metrics"""
@@ -39,7 +108,7 @@ class RiskCalculator:
         self.config = config
         
         # Risk limits
-        self.max_position_size = Decimal(config.get("max_position_size", "100000"))
+        self.max_position_size = parse_decimal(config.get("max_position_size", "100000"))
         self.max_portfolio_var = float(config.get("max_portfolio_var", 0.05))
         self.max_concentration = float(config.get("max_concentration", 0.2))
         
@@ -47,9 +116,25 @@ class RiskCalculator:
         self.var_confidence = config.get("var_confidence", 0.95)
         self.var_window = config.get("var_window", 30)
         
+        # Ring-buffer capacity: enough samples to cover the VaR window at
+        # the configured update cadence
+        update_interval = config.get("update_interval", 5)
+        self._price_buffer_cap = config.get(
+            "price_buffer_size",
+            max(1024, self.var_window * 86_400 // update_interval)
+        )
+
         # Historical data
-        self.price_history: Dict[str, pd.DataFrame] = {}
-        self.risk_metrics_history: List[RiskMetrics] = []
+        self.price_history: Dict[str, _TokenPriceHistory] = {}
+        # Per-token annualized volatility, refreshed once per risk tick
+        self._vol_cache: Dict[str, float] = {}
+        # Column layout of the returns matrix, rebuilt with it each tick;
+        # lets the beta path slice the market column without a list search
+        self._token_to_col: Dict[str, int] = {}
+        self._sol_col_idx: Optional[int] = None
+        self.risk_metrics_history: deque = deque(
+            maxlen=config.get("risk_history_max", 4096)
+        )
         
     async def calculate_portfolio_risk(
         self,
@@ -61,18 +146,40 @@ class RiskCalculator:
             # Update price history
             self._update_price_history(positions.keys(), market_data)
             
-            # Calculate returns
-            returns = self._calculate_returns()
-            
+            # Calculate returns as one stacked (T, K) matrix
+            returns, tokens = self._calculate_returns()
+
+            # Refresh the per-token vol cache once; every position's risk
+            # contribution this tick reuses it instead of recomputing
+            if returns.size:
+                with np.errstate(invalid="ignore"):
+                    vols = np.nanstd(returns, axis=0, ddof=1) * np.sqrt(252)
+                self._vol_cache = {
+                    token: (0.0 if np.isnan(v) else float(v))
+                    for token, v in zip(tokens, vols)
+                }
+            else:
+                self._vol_cache = {}
+
+            # Every metric below consumes the same portfolio return series;
+            # reduce the matrix once instead of once per helper
+            portfolio_returns = (
+                np.nanmean(returns, axis=1) if returns.size else np.empty(0)
+            )
+
             # Calculate VaR and ES
-            var, es = self._calculate_var_metrics(returns)
-            
+            var, es = self._calculate_var_metrics(portfolio_returns)
+
+            # One Welford pass supplies both the Sharpe ratio and the
+            # annualized volatility
+            mu, sigma = risk_kernels.mean_std(portfolio_returns)
+            vol = sigma * np.sqrt(252.0)
+            sharpe = (mu * 252.0) / vol if vol else 0.0
+
             # Calculate other risk metrics
-            sharpe = self._calculate_sharpe_ratio(returns)
-            drawdown = self._calculate_max_drawdown(returns)
-            beta = self._calculate_portfolio_beta(returns)
-            vol = self._calculate_portfolio_volatility(returns)
-            corr = self._calculate_correlation_matrix(returns)
+            drawdown = self._calculate_max_drawdown(portfolio_returns)
+            beta = self._calculate_portfolio_beta(portfolio_returns, returns, tokens)
+            corr = self._calculate_correlation_matrix(returns, tokens)
             
             metrics = RiskMetrics(
                 value_at_risk=var,
@@ -90,8 +197,8 @@ class RiskCalculator:
             
             return metrics
             
-        except Exception as e:
-            logging.error(f"Portfolio risk calculation error: {str(e)}")
+        except Exception:
+            log.exception("Portfolio risk calculation error")
             raise
             
     async def calculate_position_risk(
@@ -102,9 +209,9 @@ class RiskCalculator:
     ) -> PositionRisk:
         """Calculate risk metrics for individual position"""
         try:
-            size = Decimal(str(position["size"]))
-            price = Decimal(str(market_data["price"]))
-            entry_price = Decimal(str(position["entry_price"]))
+            size = parse_decimal(position["size"])
+            price = parse_decimal(market_data["price"])
+            entry_price = parse_decimal(position["entry_price"])
             
             # Calculate basic metrics
             notional = size * price
@@ -146,8 +253,8 @@ class RiskCalculator:
                 concentration_risk=concentration
             )
             
-        except Exception as e:
-            logging.error(f"Position risk calculation error: {str(e)}")
+        except Exception:
+            log.exception("Position risk calculation error")
             raise
             
     def _update_price_history(
@@ -156,128 +263,110 @@ class RiskCalculator:
         market_data: Dict[str, Dict[str, Any]]
     ):
         """Update price history for tokens"""
-        current_time = datetime.now()
-        
+        now_ns = time.time_ns()
+
         for token in tokens:
-            if token not in self.price_history:
-                self.price_history[token] = pd.DataFrame(
-                    columns=["price", "timestamp"]
+            history = self.price_history.get(token)
+            if history is None:
+                history = self.price_history[token] = _TokenPriceHistory(
+                    self._price_buffer_cap
                 )
-                
-            # Add new price data
+
+            # Add new price data; the ring buffer evicts the oldest sample
+            # automatically once full
             if token in market_data:
-                self.price_history[token] = self.price_history[token].append(
-                    {
-                        "price": float(market_data[token]["price"]),
-                        "timestamp": current_time
-                    },
-                    ignore_index=True
-                )
-                
-            # Remove old data
-            cutoff = current_time - timedelta(days=self.var_window)
-            self.price_history[token] = self.price_history[token][
-                self.price_history[token]["timestamp"] > cutoff
-            ]
+                history.append(float(market_data[token]["price"]), now_ns)
             
-    def _calculate_returns(self) -> pd.DataFrame:
-        """Calculate returns for all tokens"""
-        returns_dict = {}
-        
-        for token, df in self.price_history.items():
-            if len(df) > 1:
-                returns = df["price"].pct_change().dropna()
-                returns_dict[token] = returns
-                
-        return pd.DataFrame(returns_dict)
-        
+    def _calculate_returns(self) -> Tuple[np.ndarray, List[str]]:
+        """Calculate returns for all tokens as one (T, K) float64 matrix.
+
+        Shorter histories are NaN-padded at the tail; consumers use the
+        nan-aware reductions. One vectorized op per token replaces the
+        per-token pandas pct_change/DataFrame rebuild.
+        """
+        tokens = [t for t, h in self.price_history.items() if h.count > 1]
+        self._token_to_col = {t: i for i, t in enumerate(tokens)}
+        self._sol_col_idx = self._token_to_col.get(SOL_MINT)
+        if not tokens:
+            return np.empty((0, 0)), tokens
+
+        rows = max(self.price_history[t].count for t in tokens) - 1
+        returns = np.full((rows, len(tokens)), np.nan)
+
+        for col, token in enumerate(tokens):
+            prices = self.price_history[token].view()
+            returns[:prices.size - 1, col] = prices[1:] / prices[:-1] - 1.0
+
+        return returns, tokens
+
     def _calculate_var_metrics(
         self,
-        returns: pd.DataFrame
+        portfolio_returns: np.ndarray
     ) -> Tuple[float, float]:
         """Calculate Value at Risk and Expected Shortfall"""
-        if returns.empty:
+        if portfolio_returns.size == 0:
             return 0.0, 0.0
-            
-        # Calculate portfolio returns
-        portfolio_returns = returns.mean(axis=1)
-        
-        # Calculate VaR
-        var = np.percentile(
-            portfolio_returns,
-            (1 - self.var_confidence) * 100
-        )
-        
-        # Calculate Expected Shortfall
-        es = portfolio_returns[portfolio_returns < var].mean()
-        
+
+        # One O(N) partition gives both metrics: the k-th smallest return is
+        # the VaR and the mean of the elements below it is the ES, with no
+        # full sort or boolean-mask pass
+        n = portfolio_returns.size
+        k = max(1, int((1 - self.var_confidence) * n))
+        if k >= n:
+            var = portfolio_returns.min()
+            return abs(var), abs(var)
+
+        part = np.partition(portfolio_returns, k)
+        var = part[k]
+        es = part[:k].mean()
+
         return abs(var), abs(es) if not np.isnan(es) else 0.0
-        
-    def _calculate_sharpe_ratio(self, returns: pd.DataFrame) -> float:
-        """Calculate Sharpe Ratio"""
-        if returns.empty:
-            return 0.0
-            
-        portfolio_returns = returns.mean(axis=1)
-        
-        # Annualized Sharpe Ratio
-        mean_return = portfolio_returns.mean() * 252  # Annualize
-        std_return = portfolio_returns.std() * np.sqrt(252)  # Annualize
-        
-        if std_return == 0:
-            return 0.0
-            
-        return mean_return / std_return
-        
-    def _calculate_max_drawdown(self, returns: pd.DataFrame) -> float:
+
+    def _calculate_max_drawdown(self, portfolio_returns: np.ndarray) -> float:
         """Calculate Maximum Drawdown"""
-        if returns.empty:
-            return 0.0
-            
-        portfolio_returns = returns.mean(axis=1)
-        cumulative = (1 + portfolio_returns).cumprod()
-        running_max = cumulative.expanding(min_periods=1).max()
-        drawdowns = cumulative / running_max - 1
-        
-        return abs(drawdowns.min())
-        
-    def _calculate_portfolio_beta(self, returns: pd.DataFrame) -> float:
-        """Calculate portfolio beta against market"""
-        if returns.empty:
+        return risk_kernels.max_drawdown(portfolio_returns)
+
+    def _calculate_portfolio_beta(
+        self,
+        portfolio_returns: np.ndarray,
+        returns: np.ndarray,
+        tokens: List[str]
+    ) -> float:
+        """Calculate portfolio beta against the SOL market proxy"""
+        if portfolio_returns.size == 0 or self._sol_col_idx is None:
             return 1.0
-            
-        portfolio_returns = returns.mean(axis=1)
-        
-        # Use SOL as market proxy
-        if "So11111111111111111111111111111111111111112" in returns.columns:
-            market_returns = returns["So11111111111111111111111111111111111111112"]
-            covariance = portfolio_returns.cov(market_returns)
-            market_variance = market_returns.var()
-            
-            if market_variance == 0:
-                return 1.0
-                
-            return covariance / market_variance
-            
-        return 1.0
-        
-    def _calculate_portfolio_volatility(self, returns: pd.DataFrame) -> float:
-        """Calculate portfolio volatility"""
-        if returns.empty:
-            return 0.0
-            
-        portfolio_returns = returns.mean(axis=1)
-        return portfolio_returns.std() * np.sqrt(252)  # Annualized
-        
+
+        return risk_kernels.portfolio_beta(
+            portfolio_returns,
+            returns[:, self._sol_col_idx]
+        )
+
     def _calculate_correlation_matrix(
         self,
-        returns: pd.DataFrame
-    ) -> Optional[pd.DataFrame]:
+        returns: np.ndarray,
+        tokens: List[str]
+    ) -> Optional[Tuple[List[str], np.ndarray]]:
         """Calculate correlation matrix between assets"""
-        if returns.empty or returns.shape[1] < 2:
+        if returns.size == 0 or returns.shape[1] < 2:
             return None
-            
-        return returns.corr()
+
+        # Complete-case rows only; pairwise-NaN handling is what makes
+        # DataFrame.corr quadratic in Python-level work
+        complete = returns[~np.isnan(returns).any(axis=1)]
+        t = complete.shape[0]
+        if t < 2:
+            return None
+
+        # Standardize the columns and let BLAS compute the symmetric
+        # product: one matmul replaces K^2 pairwise correlations
+        z = complete - complete.mean(axis=0)
+        std = z.std(axis=0, ddof=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z /= std
+            corr = (z.T @ z) / (t - 1)
+        np.fill_diagonal(corr, 1.0)
+
+        return tokens, corr
         
     def _calculate_risk_contribution(
         self,
@@ -285,16 +374,18 @@ class RiskCalculator:
         notional_value: Decimal
     ) -> float:
         """Calculate risk contribution of position to portfolio"""
-        if token_address not in self.price_history:
-            return 0.0
-            
-        returns = self.price_history[token_address]["price"].pct_change().dropna()
-        
-        # Calculate metrics
-        volatility = returns.std() * np.sqrt(252)  # Annualized
-        var_contribution = float(notional_value) * volatility
-        
-        return var_contribution
+        volatility = self._vol_cache.get(token_address)
+
+        if volatility is None:
+            # Cold path: no portfolio tick has primed the cache yet
+            history = self.price_history.get(token_address)
+            if history is None or history.count < 2:
+                return 0.0
+            prices = history.view()
+            returns = prices[1:] / prices[:-1] - 1.0
+            volatility = float(returns.std(ddof=1) * np.sqrt(252))  # Annualized
+
+        return float(notional_value) * volatility
         
     def _calculate_max_loss(
         self,
@@ -305,13 +396,14 @@ class RiskCalculator:
     ) -> Decimal:
         """Calculate maximum potential loss"""
         # Consider stop loss if set
-        stop_loss = Decimal(str(market_data.get("stop_loss", 0)))
+        stop_loss = parse_decimal(market_data.get("stop_loss", 0))
         if stop_loss > 0:
             return (price - stop_loss) * size
             
         # Otherwise use historical worst case
-        if token_address in self.price_history:
-            historical_low = Decimal(str(self.price_history[token_address]["price"].min()))
+        history = self.price_history.get(token_address)
+        if history is not None and history.count:
+            historical_low = parse_decimal(history.min_price)
             return (price - historical_low) * size
             
         # Fallback to 100% loss
@@ -323,12 +415,14 @@ class RiskCalculator:
         market_data: Dict[str, Any]
     ) -> float:
         """Calculate market impact of liquidating position"""
-        liquidity = Decimal(str(market_data.get("liquidity", 0)))
+        # The result is a float ratio, so do the division in float and skip
+        # the Decimal string round-trips entirely
+        liquidity = float(market_data.get("liquidity", 0) or 0)
         if liquidity == 0:
             return 1.0
-            
+
         # Calculate impact as percentage of liquidity
-        impact = float(size / liquidity)
+        impact = float(size) / liquidity
         return min(1.0, impact)
         
     def _calculate_concentration_risk(
@@ -337,12 +431,12 @@ class RiskCalculator:
         market_data: Dict[str, Any]
     ) -> float:
         """Calculate concentration risk"""
-        market_cap = Decimal(str(market_data.get("marketCap", 0)))
+        market_cap = float(market_data.get("marketCap", 0) or 0)
         if market_cap == 0:
             return 1.0
-            
+
         # Calculate as percentage of market cap
-        concentration = float(notional_value / market_cap)
+        concentration = float(notional_value) / market_cap
         return min(1.0, concentration)
         
     def get_risk_limits(self) -> Dict[str, Any]:
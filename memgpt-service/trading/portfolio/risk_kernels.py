@@ -0,0 +1,357 @@
+"""
+Numeric kernels for portfolio risk metrics.
+
+Loop kernels are compiled with Numba (`@njit(cache=True, fastmath=True)`)
+when it is installed, replacing chains of pandas/numpy temporaries with a
+single lowered loop. Without Numba the public functions fall back to
+equivalent vectorized numpy code, so the dependency stays optional.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in so the loop kernels stay importable"""
+        if args and callable(args[0]):
+            return args[0]
+
+        def wrap(fn):
+            return fn
+        return wrap
+
+
+@njit(cache=True, fastmath=True)
+def _sharpe_loop(port_ret):
+    n = port_ret.shape[0]
+    total = 0.0
+    total_sq = 0.0
+    for i in range(n):
+        r = port_ret[i]
+        total += r
+        total_sq += r * r
+    mean = total / n
+    var = (total_sq - n * mean * mean) / (n - 1)
+    if var <= 0.0:
+        return 0.0
+    return (mean * 252.0) / ((var ** 0.5) * 252.0 ** 0.5)
+
+
+@njit(cache=True, fastmath=True)
+def _mean_std_loop(x):
+    n = x.shape[0]
+    m = 0.0
+    m2 = 0.0
+    for i in range(n):
+        d = x[i] - m
+        m += d / (i + 1)
+        m2 += d * (x[i] - m)
+    return m, (m2 / (n - 1)) ** 0.5
+
+
+@njit(cache=True, fastmath=True)
+def _beta_loop(x, y):
+    n = x.shape[0]
+    mx = 0.0
+    my = 0.0
+    c = 0.0
+    vy = 0.0
+    count = 0
+    for i in range(n):
+        xi = x[i]
+        yi = y[i]
+        if xi != xi or yi != yi:  # skip NaN samples
+            continue
+        count += 1
+        dx = xi - mx
+        mx += dx / count
+        dy = yi - my
+        my += dy / count
+        c += dx * (yi - my)
+        vy += dy * (yi - my)
+    if count < 2 or vy == 0.0:
+        return 1.0
+    return c / vy
+
+
+def mean_std(x: np.ndarray):
+    """Mean and sample std of a 1-D series in one Welford pass.
+
+    Lets callers that need both (Sharpe numerator/denominator, annualized
+    volatility) pay one memory sweep instead of three.
+    """
+    if x.size < 2:
+        return (float(x.mean()) if x.size else 0.0), 0.0
+
+    if HAVE_NUMBA:
+        m, s = _mean_std_loop(np.ascontiguousarray(x, dtype=np.float64))
+        return float(m), float(s)
+
+    m = float(x.mean())
+    s = float(x.std(ddof=1))
+    return m, (0.0 if np.isnan(s) else s)
+
+
+def sharpe_ratio(port_ret: np.ndarray) -> float:
+    """Annualized Sharpe ratio of a 1-D portfolio return series"""
+    if port_ret.size < 2:
+        return 0.0
+
+    if HAVE_NUMBA:
+        return _sharpe_loop(np.ascontiguousarray(port_ret, dtype=np.float64))
+
+    mean = port_ret.mean() * 252.0
+    std = port_ret.std(ddof=1) * np.sqrt(252.0)
+    if std == 0 or np.isnan(std):
+        return 0.0
+    return mean / std
+
+
+@njit(cache=True, fastmath=True)
+def _max_dd_loop(port_ret):
+    eq = 1.0
+    peak = 1.0
+    worst = 0.0
+    for i in range(port_ret.shape[0]):
+        eq *= 1.0 + port_ret[i]
+        if eq > peak:
+            peak = eq
+        dd = eq / peak - 1.0
+        if dd < worst:
+            worst = dd
+    return -worst
+
+
+def max_drawdown(port_ret: np.ndarray) -> float:
+    """Maximum drawdown (positive fraction) of a 1-D return series.
+
+    Single fused scan tracking equity, running peak and worst drawdown;
+    no cumprod/running-max intermediate arrays.
+    """
+    if port_ret.size == 0:
+        return 0.0
+
+    if HAVE_NUMBA:
+        return _max_dd_loop(np.ascontiguousarray(port_ret, dtype=np.float64))
+
+    cumulative = np.cumprod(1.0 + port_ret)
+    running_max = np.maximum.accumulate(cumulative)
+    return abs((cumulative / running_max - 1.0).min())
+
+
+@njit(cache=True, fastmath=True)
+def _price_mdd_loop(prices):
+    peak = prices[0]
+    mdd = 0.0
+    for i in range(1, prices.shape[0]):
+        p = prices[i]
+        if p > peak:
+            peak = p
+        dd = (p - peak) / peak
+        if dd < mdd:
+            mdd = dd
+    return mdd
+
+
+def price_max_drawdown(prices: np.ndarray) -> float:
+    """Most negative drawdown (<= 0) of a raw price series.
+
+    Single scan with scalar peak/worst registers instead of the
+    accumulate + full drawdowns array + min triple pass.
+    """
+    if prices.size == 0:
+        return 0.0
+
+    if HAVE_NUMBA:
+        return _price_mdd_loop(np.ascontiguousarray(prices, dtype=np.float64))
+
+    running_max = np.maximum.accumulate(prices)
+    return float(((prices - running_max) / running_max).min())
+
+
+@njit(cache=True, fastmath=True)
+def _log_vol_loop(prices):
+    n = prices.shape[0] - 1
+    m = 0.0
+    m2 = 0.0
+    for i in range(n):
+        r = np.log(prices[i + 1] / prices[i])
+        d = r - m
+        m += d / (i + 1)
+        m2 += d * (r - m)
+    return (m2 / n) ** 0.5
+
+
+def log_return_volatility(prices: np.ndarray, annualize: bool = True) -> float:
+    """Std of log returns computed from prices in one fused pass.
+
+    Folds diff(log(prices)) and the std reduction into a single loop so
+    no returns array is ever materialized.
+    """
+    if prices.size < 2:
+        return 0.0
+
+    if HAVE_NUMBA:
+        vol = float(_log_vol_loop(np.ascontiguousarray(prices, dtype=np.float64)))
+    else:
+        vol = float(np.std(np.diff(np.log(prices))))
+
+    return vol * np.sqrt(252.0) if annualize else vol
+
+
+@njit(cache=True, fastmath=True)
+def _excess_sharpe_loop(returns, daily_rf):
+    n = returns.shape[0]
+    total = 0.0
+    total_sq = 0.0
+    for i in range(n):
+        r = returns[i]
+        total += r
+        total_sq += r * r
+    mean = total / n
+    var = total_sq / n - mean * mean
+    if var <= 0.0:
+        return 0.0
+    return 252.0 ** 0.5 * (mean - daily_rf) / var ** 0.5
+
+
+def excess_sharpe(returns: np.ndarray, risk_free_rate: float = 0.02) -> float:
+    """Annualized Sharpe ratio over a daily risk-free rate.
+
+    One pass shares the mean/std reductions; the excess-return series is
+    never allocated (the risk-free offset is applied to the mean).
+    """
+    if returns.size == 0:
+        return 0.0
+
+    if HAVE_NUMBA:
+        return _excess_sharpe_loop(
+            np.ascontiguousarray(returns, dtype=np.float64),
+            risk_free_rate / 252.0,
+        )
+
+    std = np.std(returns)
+    if std == 0 or np.isnan(std):
+        return 0.0
+    return float(np.sqrt(252.0) * (np.mean(returns) - risk_free_rate / 252.0) / std)
+
+
+RiskSnapshot = namedtuple(
+    "RiskSnapshot",
+    ["value_at_risk", "expected_shortfall", "sharpe_ratio", "volatility",
+     "current_drawdown"],
+)
+
+
+@njit(cache=True, fastmath=True)
+def _price_stats_loop(prices):
+    n = prices.shape[0] - 1
+    total = 0.0
+    total_sq = 0.0
+    peak = prices[0]
+    for i in range(n):
+        r = prices[i + 1] / prices[i] - 1.0
+        total += r
+        total_sq += r * r
+        if prices[i + 1] > peak:
+            peak = prices[i + 1]
+    mean = total / n
+    var = total_sq / n - mean * mean
+    std = var ** 0.5 if var > 0.0 else 0.0
+    dd = (peak - prices[n]) / peak if peak > 0.0 else 0.0
+    return mean, std, dd
+
+
+def all_risk_metrics(
+    prices: np.ndarray,
+    confidence_level: float = 0.95,
+    risk_free_rate: float = 0.02,
+    out: np.ndarray = None,
+) -> RiskSnapshot:
+    """Every portfolio-level risk metric from one sweep of a price series.
+
+    One fused scan yields return mean/std (Sharpe, volatility) and the
+    current drawdown, and a single partition of the returns supplies both
+    VaR and ES — instead of five helpers each re-traversing the data.
+
+    Callers on a fixed cadence can pass a preallocated `out` buffer for
+    the returns series to avoid the per-call allocation.
+    """
+    if prices.size < 2:
+        return RiskSnapshot(0.0, 0.0, 0.0, 0.0, 0.0)
+
+    p = np.ascontiguousarray(prices, dtype=np.float64)
+    n = p.size - 1
+    if out is not None and out.shape[0] >= n:
+        returns = out[:n]
+        np.divide(p[1:], p[:-1], out=returns)
+        returns -= 1.0
+    else:
+        returns = p[1:] / p[:-1] - 1.0
+
+    if HAVE_NUMBA:
+        mean, std, dd = _price_stats_loop(p)
+    else:
+        mean = float(returns.mean())
+        std = float(returns.std())
+        peak = float(p.max())
+        dd = (peak - float(p[-1])) / peak if peak > 0 else 0.0
+
+    k = int((1 - confidence_level) * n)
+    if k <= 0:
+        var = float(returns.min())
+        es = var
+    else:
+        part = np.partition(returns, k)
+        var = float(part[k])
+        es = float(part[:k].mean())
+
+    vol = std * np.sqrt(252.0)
+    sharpe = (
+        float(np.sqrt(252.0) * (mean - risk_free_rate / 252.0) / std)
+        if std else 0.0
+    )
+    return RiskSnapshot(var, es, sharpe, vol, dd)
+
+
+def portfolio_beta(port_ret: np.ndarray, market_ret: np.ndarray) -> float:
+    """Beta of the portfolio return series against a market series.
+
+    One Welford-style pass maintains covariance and market variance
+    together instead of separate cov/var sweeps; NaN samples are skipped.
+    """
+    if port_ret.size < 2:
+        return 1.0
+
+    if HAVE_NUMBA:
+        return _beta_loop(
+            np.ascontiguousarray(port_ret, dtype=np.float64),
+            np.ascontiguousarray(market_ret, dtype=np.float64),
+        )
+
+    valid = ~(np.isnan(port_ret) | np.isnan(market_ret))
+    if valid.sum() < 2:
+        return 1.0
+    cov = np.cov(port_ret[valid], market_ret[valid], ddof=1)
+    if cov[1, 1] == 0:
+        return 1.0
+    return cov[0, 1] / cov[1, 1]
+
+
+if HAVE_NUMBA:
+    # Warm the JIT cache at import so the first tick doesn't pay compilation
+    _stub = np.array([0.0, 0.001], dtype=np.float64)
+    _sharpe_loop(_stub)
+    _mean_std_loop(_stub)
+    _max_dd_loop(_stub)
+    _beta_loop(_stub, _stub)
+    _pstub = np.array([1.0, 1.001], dtype=np.float64)
+    _price_mdd_loop(_pstub)
+    _log_vol_loop(_pstub)
+    _price_stats_loop(_pstub)
+    _excess_sharpe_loop(_stub, 0.0)
@@ -1,22 +1,49 @@
 # memgpt-service/trading/realtime.py
 
 from typing import Dict, Any, List, Optional, Callable
+from collections import deque
 from decimal import Decimal
 import asyncio
+import functools
+import time
 from datetime import datetime, timedelta
 import json
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field, is_dataclass
 import logging
 from .risk_helpers import RiskHelpers
 from .portfolio.risk_calculator import RiskCalculator
 import uuid
-import logging
 from .solana_service import SolanaService
 import aiohttp
 from base58 import b58encode, b58decode
 import hashlib
 from solana.keypair import Keypair
+import numpy as np
 from memory.utils.supabase_helpers import safe_supabase_execute, handle_supabase_response
+from .utils import jsonutils
+from .utils.timeutils import fast_iso
+
+log = logging.getLogger(__name__)
+
+
+# Shared fallbacks for wallet handling; never mutated
+_EMPTY_CREDS: Dict[str, Any] = {}
+_CRED_FLAGS = {
+    'signTransaction': True,
+    'signAllTransactions': True,
+    'connected': True
+}
+
+
+@functools.lru_cache(maxsize=4096)
+def _readonly_session_signature(public_key: str) -> str:
+    """Deterministic read-only session signature for a public key.
+
+    The output never changes for a given key, so repeat lookups come
+    straight from the cache instead of re-hashing.
+    """
+    digest = hashlib.sha256(f"readonly-session-{public_key}".encode()).digest()
+    return b58encode(digest).decode()
 
 @dataclass
 class ConsciousnessMetrics:
@@ -31,7 +58,6 @@ class ConsciousnessMetrics:
 @dataclass
 class MonitoringMetrics:
     """Real-time monitoring metrics with consciousness integration"""
-    timestamp: datetime
     portfolio_value: Decimal
     day_pnl: Decimal
     day_pnl_percent: float
@@ -44,8 +70,43 @@ class MonitoringMetrics:
     largest_position: Dict[str, Any]
     risk_warnings: List[str]
     performance_metrics: Dict[str, float]
+    # Public API keeps a datetime, but it is generated here by the factory
+    # instead of by every caller on the hot collection path
+    timestamp: datetime = field(default_factory=datetime.now)
     consciousness_state: Optional[ConsciousnessMetrics] = None
 
+def _metrics_to_dict(metrics: MonitoringMetrics) -> Dict[str, Any]:
+    """Dict view of MonitoringMetrics without asdict's recursive deep copy.
+
+    The nested containers (largest position, warnings, performance map)
+    are shared, not copied — fine for serialization, which only reads.
+    """
+    cs = metrics.consciousness_state
+    return {
+        "timestamp": metrics.timestamp,
+        "portfolio_value": metrics.portfolio_value,
+        "day_pnl": metrics.day_pnl,
+        "day_pnl_percent": metrics.day_pnl_percent,
+        "current_drawdown": metrics.current_drawdown,
+        "risk_level": metrics.risk_level,
+        "volatility_24h": metrics.volatility_24h,
+        "sharpe_ratio": metrics.sharpe_ratio,
+        "total_positions": metrics.total_positions,
+        "active_trades": metrics.active_trades,
+        "largest_position": metrics.largest_position,
+        "risk_warnings": metrics.risk_warnings,
+        "performance_metrics": metrics.performance_metrics,
+        "consciousness_state": None if cs is None else {
+            "emotional_state": cs.emotional_state,
+            "confidence_level": cs.confidence_level,
+            "attention_focus": cs.attention_focus,
+            "decision_factors": cs.decision_factors,
+            "risk_tolerance": cs.risk_tolerance,
+            "market_perception": cs.market_perception,
+        },
+    }
+
+
 class RealTimeMonitor:
     def __init__(self, config: Dict[str, Any]):
         self.config = config
@@ -62,13 +123,49 @@ class RealTimeMonitor:
         self.solana_service = None  # Remove SolanaService initialization
         self.wallet = None
         
+        # Buffered Supabase writes, flushed in batches by a background task
+        self._pending_executions: List[dict] = []
+        self._flush_interval = config.get("flush_interval", 2)
+        self._flush_batch_size = config.get("flush_batch_size", 50)
+        self._flush_task = None
+        # Wakes the flush task early when a full batch accumulates
+        self._flush_event = asyncio.Event()
+        # Rows from failed batch inserts, retried on the next flush
+        self._dead_letter: List[dict] = []
+        self._dead_letter_max = config.get("dead_letter_max", 1000)
+
+        # Set to request a clean monitoring-loop shutdown
+        self._stop = asyncio.Event()
+
+        # Columnar (SoA) ring buffer of the numeric metric fields; analytic
+        # passes read contiguous float arrays instead of re-extracting
+        # scalars from a list of dataclasses
+        hist_len = config.get("history_maxlen", 17280)
+        self._hist = {
+            name: np.empty(hist_len, dtype=np.float64)
+            for name in (
+                "timestamp_s", "portfolio_value", "day_pnl",
+                "day_pnl_percent", "current_drawdown", "volatility_24h",
+                "sharpe_ratio", "total_positions", "active_trades",
+            )
+        }
+        self._hist_pos = 0
+        self._hist_full = False
+
+        # Signature of the last broadcast payload, used to skip redundant
+        # fan-outs while the portfolio is unchanged
+        self._last_broadcast_sig = None
+
         # Initialize monitoring state
         self.monitoring_state = {
-            "last_update": datetime.now(),
-            "subscribers": [],
+            # Epoch nanoseconds; integer comparisons are cheaper than
+            # datetime objects on the update loop
+            "last_update": time.time_ns(),
+            "subscribers": {},
             "active_alerts": set(),
-            "metrics_history": [],
-            "consciousness_history": [],
+            # Bounded to ~24h of 5-second updates; deque eviction is O(1)
+            "metrics_history": deque(maxlen=config.get("history_maxlen", 17280)),
+            "consciousness_history": deque(maxlen=config.get("history_maxlen", 17280)),
             "risk_thresholds": config.get("risk_thresholds", {
                 "max_drawdown": 0.15,  # 15%
                 "position_concentration": 0.25,  # 25%
@@ -94,36 +191,95 @@ class RealTimeMonitor:
 
     async def start_monitoring(self):
         """Start the monitoring loop"""
-        while True:
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+        interval = self.config.get("update_interval", 5)
+        self._stop.clear()
+        next_tick = time.monotonic() + interval
+
+        while not self._stop.is_set():
             try:
-                # Collect and analyze metrics
-                metrics = await self.collect_metrics()
-                
-                # Update consciousness state if available
-                if hasattr(self, 'memory_processor'):
-                    consciousness = await self.update_consciousness_state(metrics)
-                    metrics.consciousness_state = consciousness
-                
-                # Check for risk alerts
-                alerts = self.check_risk_alerts(metrics)
-                
-                # Store historical data
-                self.store_metrics(metrics)
-                
-                # Notify subscribers
-                await self.notify_subscribers({
-                    "type": "metrics_update",
-                    "data": asdict(metrics),
-                    "alerts": alerts
-                })
-                
-                # Update state
-                self.monitoring_state["last_update"] = datetime.now()
-                
-            except Exception as e:
-                logging.error(f"Monitoring error: {str(e)}")
-                
-            await asyncio.sleep(self.config.get("update_interval", 5))
+                # Shield the collection so a cancellation can't leave the
+                # metrics history half-written
+                await asyncio.shield(self._monitoring_tick())
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("Monitoring error")
+
+            # Phase-locked cadence: sleep to the deadline rather than a
+            # fixed interval, so collection time doesn't stretch the
+            # effective sample rate the annualized metrics assume
+            now = time.monotonic()
+            delay = next_tick - now
+            if delay < 0:
+                log.warning("monitoring overrun by %.2fs", -delay)
+                next_tick = now + interval
+                continue
+
+            next_tick += interval
+            try:
+                # Waiting on the stop event instead of a bare sleep lets
+                # stop() end the loop immediately mid-interval
+                await asyncio.wait_for(self._stop.wait(), timeout=delay)
+                break
+            except asyncio.TimeoutError:
+                pass
+
+    async def stop(self):
+        """Request a clean shutdown of the monitoring loop"""
+        self._stop.set()
+
+    async def _monitoring_tick(self):
+        """One collection/broadcast pass of the monitoring loop"""
+        # Collect and analyze metrics
+        metrics = await self.collect_metrics()
+
+        # Update consciousness state if available
+        if hasattr(self, 'memory_processor'):
+            consciousness = await self.update_consciousness_state(metrics)
+            metrics.consciousness_state = consciousness
+
+        # Check for risk alerts
+        alerts = self.check_risk_alerts(metrics)
+
+        # Store historical data
+        self.store_metrics(metrics)
+
+        # Skip the fan-out entirely when nothing a subscriber can see has
+        # changed since the previous tick (flat market, no alerts). Every
+        # broadcast field except the timestamp participates, so a changed
+        # consciousness state still goes out in a flat market; unhashable
+        # fields contribute via repr
+        sig = hash((
+            metrics.portfolio_value,
+            metrics.day_pnl,
+            metrics.day_pnl_percent,
+            metrics.current_drawdown,
+            metrics.risk_level,
+            metrics.volatility_24h,
+            metrics.sharpe_ratio,
+            metrics.total_positions,
+            metrics.active_trades,
+            repr(metrics.largest_position),
+            repr(metrics.risk_warnings),
+            repr(metrics.performance_metrics),
+            repr(metrics.consciousness_state),
+        ))
+        if alerts or sig != self._last_broadcast_sig:
+            self._last_broadcast_sig = sig
+
+            # Notify subscribers (dataclass payloads are serialized once
+            # inside notify_subscribers)
+            await self.notify_subscribers({
+                "type": "metrics_update",
+                "data": metrics,
+                "alerts": alerts
+            })
+
+        # Update state
+        self.monitoring_state["last_update"] = time.time_ns()
 
     async def collect_metrics(self) -> MonitoringMetrics:
         """Collect real-time metrics"""
@@ -138,7 +294,6 @@ class RealTimeMonitor:
             risk_metrics = await self.calculate_risk_metrics(portfolio)
             
             return MonitoringMetrics(
-                timestamp=datetime.now(),
                 portfolio_value=portfolio["total_value"],
                 day_pnl=performance["day_pnl"],
                 day_pnl_percent=performance["day_pnl_percent"],
@@ -189,39 +344,80 @@ class RealTimeMonitor:
 
     def store_metrics(self, metrics: MonitoringMetrics):
         """Store metrics for historical analysis"""
-        self.monitoring_state["metrics_history"].append(asdict(metrics))
-        
-        # Keep last 24 hours of data (assuming 5-second updates)
-        max_history = 17280  # 24 * 60 * 12
-        if len(self.monitoring_state["metrics_history"]) > max_history:
-            self.monitoring_state["metrics_history"] = self.monitoring_state["metrics_history"][-max_history:]
+        # Store the dataclass itself; converting to a dict happens lazily
+        # when something actually serializes it. deque maxlen keeps the
+        # last 24 hours (assuming 5-second updates)
+        self.monitoring_state["metrics_history"].append(metrics)
+
+        # Mirror the numeric fields into the columnar ring buffer
+        pos = self._hist_pos
+        hist = self._hist
+        # Epoch seconds: float64 holds these exactly, unlike nanoseconds
+        hist["timestamp_s"][pos] = metrics.timestamp.timestamp()
+        hist["portfolio_value"][pos] = float(metrics.portfolio_value)
+        hist["day_pnl"][pos] = float(metrics.day_pnl)
+        hist["day_pnl_percent"][pos] = metrics.day_pnl_percent
+        hist["current_drawdown"][pos] = metrics.current_drawdown
+        hist["volatility_24h"][pos] = metrics.volatility_24h
+        hist["sharpe_ratio"][pos] = metrics.sharpe_ratio
+        hist["total_positions"][pos] = metrics.total_positions
+        hist["active_trades"][pos] = metrics.active_trades
+
+        self._hist_pos = pos + 1
+        if self._hist_pos == hist["portfolio_value"].shape[0]:
+            self._hist_pos = 0
+            self._hist_full = True
+
+    def history_column(self, name: str) -> np.ndarray:
+        """Chronological view of one numeric metric column"""
+        col = self._hist[name]
+        if not self._hist_full:
+            return col[:self._hist_pos]
+        pos = self._hist_pos
+        return np.concatenate((col[pos:], col[:pos]))
 
     async def subscribe(self, callback: Callable[[Dict[str, Any]], None]) -> str:
         """Subscribe to monitoring updates"""
-        self.monitoring_state["subscribers"].append(callback)
-        return str(len(self.monitoring_state["subscribers"]) - 1)
-
-    async def unsubscribe(self, subscriber_id: str):
-        """Unsubscribe from updates"""
-        idx = int(subscriber_id)
-        if idx < len(self.monitoring_state["subscribers"]):
-            self.monitoring_state["subscribers"].pop(idx)
+        subscriber_id = uuid.uuid4().hex
+        self.monitoring_state["subscribers"][subscriber_id] = callback
+        return subscriber_id
+
+    async def unsubscribe(self, subscriber_id: str) -> bool:
+        """Unsubscribe from updates; returns whether the id was registered"""
+        return (
+            self.monitoring_state["subscribers"].pop(subscriber_id, None)
+            is not None
+        )
 
     async def notify_subscribers(self, update: Dict[str, Any]):
         """Notify all subscribers of updates"""
-        # First broadcast to Supabase realtime
-        await self.broadcast_trading_update(
+        # Convert dataclass payloads exactly once for all consumers;
+        # metrics get the cheap shallow converter, anything else falls
+        # back to asdict
+        data = update.get("data")
+        if isinstance(data, MonitoringMetrics):
+            update = {**update, "data": _metrics_to_dict(data)}
+        elif is_dataclass(data):
+            update = {**update, "data": asdict(data)}
+
+        # Fan out the realtime broadcast and all local subscribers together
+        # so one slow consumer doesn't stall the rest
+        subscribers = list(self.monitoring_state["subscribers"].items())
+        tasks = [self.broadcast_trading_update(
             update_type=update["type"],
             data=update["data"],
             channel="trading_updates"
-        )
-        
-        # Then notify local subscribers
-        for subscriber in self.monitoring_state["subscribers"]:
-            try:
-                await subscriber(update)
-            except Exception as e:
-                logging.error(f"Error notifying subscriber: {str(e)}")
+        )]
+        tasks.extend(callback(update) for _, callback in subscribers)
+
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        if isinstance(results[0], Exception):
+            log.error("Error broadcasting update: %s", results[0])
+        for (subscriber_id, _), result in zip(subscribers, results[1:]):
+            if isinstance(result, Exception):
+                log.error(
+                    "Error notifying subscriber %s: %s", subscriber_id, result
+                )
 
     async def setup_wallet(self, private_key: str = None, wallet_info: Dict = None):
         """Initialize wallet for trading"""
@@ -282,17 +478,21 @@ class RealTimeMonitor:
 
             trade_id = str(uuid.uuid4())
 
+            # Resolve credentials once instead of allocating a fresh
+            # fallback dict per lookup
+            creds = wallet_info.get('credentials', _EMPTY_CREDS)
+
             # Get original signature FIRST and keep it separate
             original_signature = (
-                wallet_info.get('credentials', {}).get('signature') or
+                creds.get('signature') or
                 wallet_info.get('signature')
             )
 
             # Get session ID separately
             session_id = (
                 wallet_info.get('sessionId') or
-                wallet_info.get('credentials', {}).get('sessionId') or
-                wallet_info.get('credentials', {}).get('sessionSignature')
+                creds.get('sessionId') or
+                creds.get('sessionSignature')
             )
 
             if not original_signature:
@@ -303,22 +503,21 @@ class RealTimeMonitor:
                     'user_message': 'Wallet authentication failed'
                 }
 
-            # Add wallet info to trade params with consistent session ID
-            trade_params = {
-                **params,  # Keep existing params
-                'wallet': {
-                    'publicKey': wallet_info.get('publicKey'),
+            # Add wallet info to trade params with consistent session ID;
+            # one shallow copy plus shared flag constants keeps allocation
+            # down on the trade path
+            pub_key = wallet_info.get('publicKey')
+            trade_params = dict(params)
+            trade_params['wallet'] = {
+                'publicKey': pub_key,
+                'sessionId': session_id,
+                'signature': original_signature,  # Keep original signature
+                'credentials': {
+                    'publicKey': pub_key,
                     'sessionId': session_id,
-                    'signature': original_signature,  # Keep original signature
-                    'credentials': {
-                        'publicKey': wallet_info.get('publicKey'),
-                        'sessionId': session_id,
-                        'signature': original_signature,  # Keep original signature separate
-                        'sessionSignature': session_id,  # Session signature is session ID
-                        'signTransaction': True,
-                        'signAllTransactions': True,
-                        'connected': True
-                    }
+                    'signature': original_signature,  # Keep original signature separate
+                    'sessionSignature': session_id,  # Session signature is session ID
+                    **_CRED_FLAGS
                 }
             }
 
@@ -334,7 +533,7 @@ class RealTimeMonitor:
                     'signature': swap_result.get('signature'),
                     'params': params,
                     'result': swap_result,
-                    'timestamp': datetime.now().isoformat()
+                    'timestamp': fast_iso()
                 }
 
             except Exception as e:
@@ -355,16 +554,16 @@ class RealTimeMonitor:
                 'user_message': 'Failed to execute trade due to an internal error.'
             }
 
-    async def generate_readonly_session_signature(public_key: str) -> str:
+    @staticmethod
+    def generate_readonly_session_signature(public_key: str) -> str:
         """Generate a deterministic but secure signature for read-only sessions"""
-        message = f"readonly-session-{public_key}".encode()
-        hash_obj = hashlib.sha256(message)
-        return b58encode(hash_obj.digest()).decode()
+        return _readonly_session_signature(public_key)
 
+    @staticmethod
     def initialize_readonly_wallet(public_key: str):
         wallet_info = {
             "publicKey": public_key,
-            "signature": generate_readonly_session_signature(public_key),
+            "signature": _readonly_session_signature(public_key),
             "credentials": {
                 "publicKey": public_key,
                 "signTransaction": True,
@@ -383,7 +582,7 @@ class RealTimeMonitor:
                     data={
                         "type": update_type,
                         "data": data,
-                        "timestamp": datetime.now().isoformat()
+                        "timestamp": fast_iso()
                     }
                 )
         except Exception as e:
@@ -392,28 +591,68 @@ class RealTimeMonitor:
     async def store_trade_execution(self, data: dict) -> None:
         try:
             if isinstance(data, str):
-                data = json.loads(data)
-                
+                data = jsonutils.loads(data)
+
             execution_data = {
                 **data,
-                'timestamp': datetime.now().isoformat()
+                'timestamp': fast_iso()
             }
-            # Use safe_supabase_execute
-            success, result = await safe_supabase_execute(
-                self.supabase.table('trade_executions').insert(execution_data),
-                error_message="Failed to store trade execution"
-            )
-            
-            if not success:
-                logging.error(f"Supabase insert error: {result}")
-                raise Exception(f"Database insert failed: {result}")
-                
-            return result
+
+            # Buffer the row; the flush loop batches pending rows into a
+            # single insert so each trade doesn't pay a full round-trip
+            self._pending_executions.append(execution_data)
+
+            if self._flush_task is None:
+                # No background task running (monitoring not started):
+                # flush inline so the row isn't stranded
+                await self._flush_pending_executions()
+            elif len(self._pending_executions) >= self._flush_batch_size:
+                # Wake the flush task early rather than paying the insert
+                # round-trip on the trade path
+                self._flush_event.set()
 
         except Exception as e:
             logging.error(f"Error storing trade execution: {str(e)}")
             raise
 
+    async def _flush_loop(self):
+        """Flush buffered Supabase writes on an interval or full batch"""
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._flush_event.wait(), timeout=self._flush_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+            try:
+                await self._flush_pending_executions()
+            except Exception:
+                log.exception("Error flushing trade executions")
+
+    async def _flush_pending_executions(self):
+        """Write all buffered trade executions in one batched insert"""
+        if not self.supabase:
+            return
+
+        # Retry previously failed rows ahead of the fresh batch
+        batch = self._dead_letter + self._pending_executions
+        if not batch:
+            return
+        self._dead_letter = []
+        self._pending_executions = []
+
+        success, result = await safe_supabase_execute(
+            self.supabase.table('trade_executions').insert(batch),
+            error_message="Failed to store trade executions"
+        )
+
+        if not success:
+            # Keep the rows for the next flush instead of dropping them
+            self._dead_letter = batch[-self._dead_letter_max:]
+            log.error("Supabase batch insert error: %s", result)
+            raise Exception(f"Database insert failed: {result}")
+
     async def _send_trade_error(self, trade_id: str, error: str):
         """Send trade error update via WebSocket"""
         await self.broadcast_trading_update(
@@ -422,7 +661,7 @@ class RealTimeMonitor:
                 "trade_id": trade_id,
                 "status": "error",
                 "error": error,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": fast_iso()
             },
             channel="trading_updates"
         )
@@ -453,7 +692,7 @@ class RealTimeMonitor:
                         "trade_id": trade_id,
                         "status": status,
                         "signature": tx_signature,
-                        "timestamp": datetime.now().isoformat()
+                        "timestamp": fast_iso()
                     },
                     channel="trading_updates"
                 )
@@ -511,10 +750,28 @@ class RealTimeMonitor:
             logging.error(f"Error processing trade execution: {str(e)}")
             # Don't raise the error to avoid breaking the trade flow
 
-    def __del__(self):
-    # Ensure clean shutdown
-        if hasattr(self, 'ws_handler') and self.ws_handler:
+    async def aclose(self):
+        """Release monitor resources; consumers must await this at shutdown.
+
+        Replaces the old __del__ hook, which ran during interpreter
+        teardown when the event loop may already be gone and silently
+        leaked sockets.
+        """
+        self._stop.set()
+
+        if self._flush_task is not None:
+            self._flush_task.cancel()
             try:
-                self.ws_handler.close()
-            except:
-                pass
\ No newline at end of file
+                await self._flush_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._flush_task = None
+
+        # Final flush so buffered executions aren't lost on shutdown
+        try:
+            await self._flush_pending_executions()
+        except Exception:
+            log.exception("Final trade-execution flush failed")
+
+        if self.ws_handler:
+            await self.ws_handler.cleanup()
\ No newline at end of file
@@ -1,18 +1,32 @@
 # memgpt-service/trading/risk_manager.py
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from decimal import Decimal
 from dataclasses import dataclass
 import numpy as np
 from datetime import datetime
+import asyncio
 import logging
+import time
 
-@dataclass
+from .portfolio import risk_kernels
+
+@dataclass(frozen=True)
 class RiskLimits:
     max_position_size: Decimal
     max_portfolio_value: Decimal
     max_drawdown: float
     min_liquidity: Decimal
     max_slippage: float
+    # Float mirrors of the Decimal limits, populated once at construction
+    # so the per-trade checks avoid Decimal parsing and arithmetic
+    _max_position_size_f: float = 0.0
+    _max_portfolio_value_f: float = 0.0
+    _min_liquidity_f: float = 0.0
+
+    def __post_init__(self):
+        object.__setattr__(self, "_max_position_size_f", float(self.max_position_size))
+        object.__setattr__(self, "_max_portfolio_value_f", float(self.max_portfolio_value))
+        object.__setattr__(self, "_min_liquidity_f", float(self.min_liquidity))
 
 @dataclass
 class RiskMetrics:
@@ -25,7 +39,16 @@ class RiskMetrics:
 class RiskManager:
     def __init__(self, config: Dict[str, Any]):
         self.config = config
-        
+
+        # Market-data TTL cache: every sub-check within a risk gate shares
+        # one fetch instead of each re-hitting the network
+        self._market_data_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._market_data_ttl = config.get("market_data_ttl", 5.0)
+
+        # Reused returns buffer for the metrics kernel; sized for the
+        # longest history we feed it so steady-state calls allocate nothing
+        self._ret_buf = np.empty(config.get("returns_buffer_size", 8192))
+
         # Initialize risk limits based on user type
         self.admin_limits = RiskLimits(
             max_position_size=Decimal("100"),  # 100 SOL
@@ -58,7 +81,17 @@ class RiskManager:
                 max_slippage=0.02
             )
         }
-        
+
+        # Merged (user_type, tier) lookup table so the per-trade path is a
+        # single dict get with a safe default instead of branch + KeyError
+        self._limits = {
+            ('admin', t): self.admin_limits
+            for t in (None, 'basic', 'premium', 'vip')
+        }
+        self._limits.update(
+            (('holder', t), l) for t, l in self.holder_limits.items()
+        )
+
     async def check_trade_risk(
         self,
         trade: Dict[str, Any],
@@ -67,36 +100,51 @@ class RiskManager:
     ) -> Dict[str, Any]:
         """Check if trade meets risk requirements"""
         try:
-            limits = self.admin_limits if user_type == 'admin' else self.holder_limits[tier]
-            
-            # Check position size
-            if Decimal(str(trade['size'])) > limits.max_position_size:
+            limits = self._limits.get((user_type, tier), self.holder_limits['basic'])
+
+            # Check position size (float comparison; Decimal precision only
+            # matters when emitting quantities, not when gating them)
+            if float(trade['size']) > limits._max_position_size_f:
                 return {
                     "allowed": False,
                     "reason": "Position size exceeds limit"
                 }
                 
+            # Fetch market data once; every sub-check below reuses it
+            market_data = await self._get_market_data_cached(trade['token'])
+
+            # The sub-checks are independent, so run them concurrently and
+            # evaluate pass/fail once they all land; latency becomes the
+            # slowest check instead of the sum of all four
+            liquidity_ok, estimated_slippage, liquidity_score, risk_score = (
+                await asyncio.gather(
+                    self._check_liquidity(market_data, limits.min_liquidity),
+                    self._estimate_slippage(trade, market_data),
+                    self._calculate_liquidity_score(market_data),
+                    self._calculate_risk_score(trade, market_data)
+                )
+            )
+
             # Check liquidity
-            if not await self._check_liquidity(trade['token'], limits.min_liquidity):
+            if not liquidity_ok:
                 return {
                     "allowed": False,
                     "reason": "Insufficient liquidity"
                 }
-                
+
             # Check slippage
-            estimated_slippage = await self._estimate_slippage(trade)
             if estimated_slippage > limits.max_slippage:
                 return {
                     "allowed": False,
                     "reason": f"Estimated slippage ({estimated_slippage:.2%}) too high"
                 }
-                
+
             return {
                 "allowed": True,
                 "metrics": {
                     "estimated_slippage": estimated_slippage,
-                    "liquidity_score": await self._calculate_liquidity_score(trade['token']),
-                    "risk_score": await self._calculate_risk_score(trade)
+                    "liquidity_score": liquidity_score,
+                    "risk_score": risk_score
                 }
             }
             
@@ -116,10 +164,10 @@ class RiskManager:
         """Calculate optimal position size"""
         try:
             # Get market data
-            market_data = await self._get_market_data(token)
-            
+            market_data = await self._get_market_data_cached(token)
+
             # Calculate base position size
-            limits = self.admin_limits if user_type == 'admin' else self.holder_limits[tier]
+            limits = self._limits.get((user_type, tier), self.holder_limits['basic'])
             base_size = limits.max_position_size * Decimal("0.1")  # Start with 10% of max
             
             # Adjust for volatility
@@ -127,7 +175,7 @@ class RiskManager:
             volatility_factor = Decimal(str(1 - min(volatility * 2, 0.5)))
             
             # Adjust for liquidity
-            liquidity_score = await self._calculate_liquidity_score(token)
+            liquidity_score = await self._calculate_liquidity_score(market_data)
             liquidity_factor = Decimal(str(liquidity_score))
             
             # Calculate final size
@@ -150,26 +198,36 @@ class RiskManager:
         try:
             # Get historical data
             historical_data = await self._get_historical_data(portfolio)
-            
-            # Calculate metrics
-            returns = self._calculate_returns(historical_data)
-            volatility = float(np.std(returns) * np.sqrt(252))  # Annualized
-            
-            value_at_risk = self._calculate_var(returns, 0.95)
-            expected_shortfall = self._calculate_es(returns, 0.95)
-            sharpe_ratio = self._calculate_sharpe_ratio(returns)
-            current_drawdown = self._calculate_current_drawdown(historical_data)
-            
+
+            # One fused kernel computes every metric from a single sweep
+            # of the price series instead of five separate helpers
+            snapshot = risk_kernels.all_risk_metrics(
+                np.asarray(historical_data, dtype=np.float64),
+                confidence_level=0.95,
+                out=self._ret_buf
+            )
+
             return RiskMetrics(
-                value_at_risk=value_at_risk,
-                expected_shortfall=expected_shortfall,
-                sharpe_ratio=sharpe_ratio,
-                volatility=volatility,
-                current_drawdown=current_drawdown
+                value_at_risk=snapshot.value_at_risk,
+                expected_shortfall=snapshot.expected_shortfall,
+                sharpe_ratio=snapshot.sharpe_ratio,
+                volatility=snapshot.volatility,
+                current_drawdown=snapshot.current_drawdown
             )
             
         except Exception as e:
             logging.error(f"Risk metrics calculation error: {str(e)}")
             raise
 
+    async def _get_market_data_cached(self, token: str) -> Dict[str, Any]:
+        """Market data for a token, cached for a short TTL"""
+        cached = self._market_data_cache.get(token)
+        now = time.monotonic()
+        if cached is not None and now - cached[0] < self._market_data_ttl:
+            return cached[1]
+
+        data = await self._get_market_data(token)
+        self._market_data_cache[token] = (now, data)
+        return data
+
     # Helper methods...
\ No newline at end of file
@@ -1,108 +1,187 @@
 # memgpt-service/trading/services/solana_bridge.py
-from typing import Dict, Any, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
 import aiohttp
+import asyncio
 import json
-from functools import lru_cache
+import logging
 import os
+import time
+from decimal import Decimal
+
+from ..utils.jsonutils import dumps_str, loads
+from .transport import AgentKitTransport
 
 class SolanaBridge:
     """Bridge service to communicate with Solana Agent Kit frontend"""
-    
-    def __init__(self, config: Dict[str, Any] = None):
+
+    # Per-request deadlines so a hung frontend can't hold semaphore slots
+    # forever: short for reads, longer for trade-type calls
+    _READ_TIMEOUT = aiohttp.ClientTimeout(total=5, connect=1)
+    _TRADE_TIMEOUT = aiohttp.ClientTimeout(total=15, connect=1)
+
+    def __init__(self, config: Dict[str, Any] = None, transport: AgentKitTransport = None):
         self.config = config or {}
-        self.api_url = self.config.get("solana_api_url", 
+        self.api_url = self.config.get("solana_api_url",
             os.getenv("SOLANA_API_URL", "http://localhost:3000/api/solana"))
         self.wallet_address = None
+        # Shared transport: pass the same instance to SolanaService and
+        # all frontend traffic rides one pool behind one semaphore
+        self.transport = transport or AgentKitTransport()
+        # TTL cache for token data; keyed by mint, bounded by maxsize
+        self._token_data_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._token_data_ttl = self.config.get("token_data_ttl", 60)
+        self._token_data_maxsize = 512
+        # Latest streamed price per mint, fed by the WebSocket task below
+        self._live_prices: Dict[str, Decimal] = {}
+        self._price_stream_task: Optional[asyncio.Task] = None
+
+    async def close(self):
+        """Close the shared transport at service shutdown"""
+        if self._price_stream_task is not None:
+            self._price_stream_task.cancel()
+            try:
+                await self._price_stream_task
+            except asyncio.CancelledError:
+                pass
+            self._price_stream_task = None
+        await self.transport.close()
+
+    async def subscribe_prices(self, mints: List[str]) -> AsyncIterator[Dict[str, Any]]:
+        """Stream Pyth price updates for `mints` over one WebSocket.
+
+        One persistent subscription replaces per-poll HTTP round-trips;
+        reaction latency drops from the poll interval to push latency.
+        """
+        session = await self.transport.get_session()
+        async with session.ws_connect(f"{self.api_url}/pyth-ws") as ws:
+            await ws.send_str(dumps_str({"action": "subscribe", "mints": mints}))
+            async for msg in ws:
+                if msg.type in (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY):
+                    yield loads(msg.data)
+                elif msg.type == aiohttp.WSMsgType.ERROR:
+                    break
+
+    def start_price_stream(self, mints: List[str]) -> None:
+        """Start the background task keeping _live_prices current"""
+        if self._price_stream_task is None or self._price_stream_task.done():
+            self._price_stream_task = asyncio.create_task(
+                self._price_stream_loop(list(mints))
+            )
+
+    async def _price_stream_loop(self, mints: List[str]) -> None:
+        while True:
+            try:
+                async for update in self.subscribe_prices(mints):
+                    mint = update.get('mint')
+                    price = update.get('price')
+                    if mint is not None and price is not None:
+                        self._live_prices[mint] = Decimal(str(price))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.warning(f"Price stream dropped, reconnecting: {e}")
+                await asyncio.sleep(1)
+
+    def get_live_price(self, mint: str) -> Optional[Decimal]:
+        """Latest streamed price for a mint, or None when not subscribed.
+
+        A dict lookup: callers polling prices should prefer this (after
+        start_price_stream) over fetch_pyth_price's HTTP round-trip.
+        """
+        return self._live_prices.get(mint)
 
     async def set_wallet(self, wallet_address: str):
         """Update wallet address"""
         self.wallet_address = wallet_address
-        async with aiohttp.ClientSession() as session:
-            await session.post(
-                f"{self.api_url}/wallet/connect",
-                json={"wallet_address": wallet_address}
-            )
-        
+        await self.transport.post_json(
+            f"{self.api_url}/wallet/connect",
+            {"wallet_address": wallet_address},
+            timeout=self._READ_TIMEOUT,
+            error_message="Failed to connect wallet",
+            decode=False
+        )
+
     async def get_token_data(self, token_address: str) -> Dict[str, Any]:
         """Get token data through frontend Solana Agent Kit"""
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.api_url}/token-data",
-                json={
-                    "token_address": token_address,
-                }
-            ) as response:
-                if not response.ok:
-                    raise ValueError(f"Failed to get token data: {await response.text()}")
-                return await response.json()
-                
+        return await self.transport.post_json(
+            f"{self.api_url}/token-data",
+            {"token_address": token_address},
+            timeout=self._READ_TIMEOUT,
+            error_message="Failed to get token data"
+        )
+
     async def fetch_pyth_price(self, token_address: str) -> Dict[str, Any]:
         """Get Pyth price through frontend Solana Agent Kit"""
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.api_url}/pyth-price",
-                json={
-                    "token_address": token_address,
-                }
-            ) as response:
-                if not response.ok:
-                    raise ValueError(f"Failed to fetch Pyth price: {await response.text()}")
-                return await response.json()
+        return await self.transport.post_json(
+            f"{self.api_url}/pyth-price",
+            {"token_address": token_address},
+            timeout=self._READ_TIMEOUT,
+            error_message="Failed to fetch Pyth price"
+        )
 
     async def execute_trade(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Execute trade through frontend Solana Agent Kit"""
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.api_url}/trade",
-                json=params
-            ) as response:
-                if not response.ok:
-                    raise ValueError(f"Failed to execute trade: {await response.text()}")
-                return await response.json()
-            
+        return await self.transport.post_json(
+            f"{self.api_url}/trade",
+            params,
+            timeout=self._TRADE_TIMEOUT,
+            error_message="Failed to execute trade"
+        )
+
     async def execute_trade_with_wallet(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Execute trade with connected wallet"""
         if not self.wallet_address:
             raise ValueError("No wallet connected")
-            
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.api_url}/trade",
-                json={
-                    **params,
-                    "wallet_address": self.wallet_address
-                }
-            ) as response:
-                return await response.json()
+
+        return await self.transport.post_json(
+            f"{self.api_url}/trade",
+            {**params, "wallet_address": self.wallet_address},
+            timeout=self._TRADE_TIMEOUT,
+            error_message="Failed to execute trade"
+        )
 
     async def stake(self, amount: float) -> Dict[str, Any]:
         """Stake SOL through frontend"""
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.api_url}/stake",
-                json={"amount": amount}
-            ) as response:
-                return await response.json()
+        return await self.transport.post_json(
+            f"{self.api_url}/stake",
+            {"amount": amount},
+            timeout=self._TRADE_TIMEOUT,
+            error_message="Failed to stake"
+        )
 
     async def send_compressed_airdrop(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Send compressed airdrop"""
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.api_url}/airdrop/compressed",
-                json=params
-            ) as response:
-                return await response.json()
+        return await self.transport.post_json(
+            f"{self.api_url}/airdrop/compressed",
+            params,
+            timeout=self._TRADE_TIMEOUT,
+            error_message="Failed to send airdrop"
+        )
 
     async def create_market(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Create market"""
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.api_url}/market/create",
-                json=params
-            ) as response:
-                return await response.json()
-
-    @lru_cache(maxsize=100)
-    def get_cached_token_data(self, token_address: str) -> Dict[str, Any]:
-        """Cached version of token data (useful for frequently accessed tokens)"""
-        return self.get_token_data(token_address)
\ No newline at end of file
+        return await self.transport.post_json(
+            f"{self.api_url}/market/create",
+            params,
+            timeout=self._TRADE_TIMEOUT,
+            error_message="Failed to create market"
+        )
+
+    async def get_cached_token_data(self, token_address: str) -> Dict[str, Any]:
+        """Token data with a short TTL cache for frequently accessed tokens.
+
+        lru_cache does not work on coroutines (it would cache the coroutine
+        object from the first call, which can only be awaited once), so this
+        caches the awaited result with an expiry instead.
+        """
+        cached = self._token_data_cache.get(token_address)
+        now = time.monotonic()
+        if cached is not None and now - cached[0] < self._token_data_ttl:
+            return cached[1]
+
+        data = await self.get_token_data(token_address)
+        if len(self._token_data_cache) >= self._token_data_maxsize:
+            # Evict the oldest insertion to keep the cache bounded
+            self._token_data_cache.pop(next(iter(self._token_data_cache)))
+        self._token_data_cache[token_address] = (now, data)
+        return data
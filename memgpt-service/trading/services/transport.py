@@ -0,0 +1,89 @@
+# memgpt-service/trading/services/transport.py
+from typing import Dict, Any, Optional
+import aiohttp
+import asyncio
+import os
+
+from ..utils.jsonutils import dumps_bytes, dumps_str, loads
+
+# Default headers for JSON posts; copied per request before mutation
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+
+
+class AgentKitTransport:
+    """Shared HTTP transport for the Solana frontend clients.
+
+    SolanaBridge and SolanaService hit the same origin through separate
+    sessions, each with its own connection pool, DNS cache and
+    concurrency gate. Sharing one transport maximizes keep-alive reuse:
+    all frontend traffic travels over a single pooled session behind a
+    single semaphore.
+
+    HTTP/1.1 keep-alive only: aiohttp does not speak HTTP/2, and moving
+    to httpx for multiplexing would add a dependency for a single-origin
+    localhost hop where pooled keep-alive connections already avoid the
+    per-request handshake cost.
+    """
+
+    def __init__(self, max_concurrency: int = None):
+        self.max_concurrency = max_concurrency or int(
+            os.getenv("AGENT_KIT_MAX_CONCURRENCY", "50")
+        )
+        self.sem = asyncio.Semaphore(self.max_concurrency)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Lazily create the shared ClientSession"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=100,
+                    limit_per_host=self.max_concurrency,
+                    ttl_dns_cache=300,
+                    use_dns_cache=True,
+                    keepalive_timeout=75,
+                    enable_cleanup_closed=True,
+                    force_close=False
+                ),
+                # Session-wide deadline as a safety net for any request
+                # made without an explicit per-call timeout
+                timeout=aiohttp.ClientTimeout(total=15),
+                # Callers using json= instead of post_json still get the
+                # orjson-backed encoder
+                json_serialize=dumps_str
+            )
+        return self._session
+
+    async def post_json(
+        self,
+        url: str,
+        payload: Dict[str, Any],
+        headers: Dict[str, str] = None,
+        timeout: aiohttp.ClientTimeout = None,
+        error_message: str = None,
+        decode: bool = True
+    ) -> Any:
+        """POST a JSON payload and return the decoded JSON response.
+
+        `error_message` prefixes the ValueError raised on a non-2xx
+        status; `decode=False` skips body decoding for endpoints whose
+        response the caller ignores.
+        """
+        session = await self.get_session()
+        async with self.sem, session.post(
+            url,
+            data=dumps_bytes(payload),
+            headers=headers or dict(_JSON_HEADERS),
+            timeout=timeout
+        ) as response:
+            if not response.ok:
+                prefix = error_message or f"Request to {url} failed"
+                raise ValueError(f"{prefix}: {await response.text()}")
+            if not decode:
+                return None
+            return loads(await response.read())
+
+    async def close(self):
+        """Close the shared session at shutdown"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
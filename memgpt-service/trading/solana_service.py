@@ -1,26 +1,101 @@
 # memgpt-service/trading/solana_service.py
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
+import asyncio
 import logging
+import time
+from functools import lru_cache, partial
 from decimal import Decimal
 from datetime import datetime, timedelta
 import uuid
 import aiohttp
 import os
 import json
+import re
+import types
 from memory.utils.supabase_helpers import safe_supabase_execute, handle_supabase_response
+from .utils.jsonutils import dumps_bytes, loads
+from .utils.timeutils import fast_iso
+from .services.transport import AgentKitTransport
+
+logger = logging.getLogger(__name__)
+
+# Default headers for agent-kit calls; copied per request before mutation
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+
+# Shared empty dict so credential lookups don't allocate a default per miss
+_EMPTY_CREDS: Dict[str, Any] = {}
+
+
+def _redact(secret: Optional[str]) -> str:
+    """Trim a signature/session ID to a loggable prefix"""
+    return f"{secret[:6]}…" if secret else "-"
+
+# Supabase clients keyed by (url, key): each create_client spins up its
+# own HTTP session and auth state, so service instances share one
+_SUPABASE_CLIENTS: Dict[Tuple[str, str], Any] = {}
+
+
+def _get_supabase(url: str, key: str):
+    client = _SUPABASE_CLIENTS.get((url, key))
+    if client is None:
+        from supabase import create_client
+        client = create_client(url, key)
+        _SUPABASE_CLIENTS[(url, key)] = client
+    return client
+
+
+# Solana mint addresses are 32-44 chars of the base58 alphabet; a length
+# check alone misclassifies both short mints (len != 44 exists, e.g.
+# vault PDAs) and 44-char strings containing 0/O/I/l
+_B58_MINT_RE = re.compile(r'^[1-9A-HJ-NP-Za-km-z]{32,44}$')
+
+try:
+    import based58  # Rust-backed base58 decode; optional
+except ImportError:
+    based58 = None
+
+try:
+    import ijson  # streaming parse for the multi-MB Jupiter list; optional
+except ImportError:
+    ijson = None
+
+
+@lru_cache(maxsize=1024)
+def _is_valid_mint(s: str) -> bool:
+    """True when `s` plausibly is a Solana mint address.
+
+    With based58 installed this is a strict decode-to-32-bytes check;
+    otherwise the alphabet regex, which admits a few non-key strings but
+    never rejects a real key.
+    """
+    if based58 is not None:
+        try:
+            return len(based58.b58decode(s.encode())) == 32
+        except ValueError:
+            return False
+    return _B58_MINT_RE.match(s) is not None
 
 class SolanaService:
     """Solana utilities that coordinate with frontend agent-kit"""
-    def __init__(self, supabase_client=None):
+
+    # Per-request deadlines so a hung frontend can't pin trading tasks
+    # (and the semaphore slots they hold) indefinitely: short for reads,
+    # longer for trades that do on-chain work
+    _READ_TIMEOUT = aiohttp.ClientTimeout(total=5, connect=1)
+    _TRADE_TIMEOUT = aiohttp.ClientTimeout(total=15, connect=1)
+    _TRADE_ACTIONS = frozenset({'trade', 'tradeWithVerification', 'stake', 'initSession'})
+    # Idempotent reads that may be retried once after a timeout
+    _RETRYABLE_ACTIONS = frozenset({'getTokenData', 'getPrice', 'getRoutes'})
+
+    def __init__(self, supabase_client=None, transport: AgentKitTransport = None):
         # Initialize Supabase client
         self.supabase = supabase_client
         if not self.supabase:
-            from supabase import create_client
             url = os.getenv("SUPABASE_URL")
             key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
             if not url or not key:
                 raise ValueError("Missing Supabase credentials")
-            self.supabase = create_client(url, key)
+            self.supabase = _get_supabase(url, key)
 
         # Ensure RPC URL is properly formatted
         default_rpc = 'https://api.mainnet-beta.solana.com'
@@ -40,6 +115,14 @@ class SolanaService:
         
         # Log which environment we're using
         logging.info(f"Initializing SolanaService with frontend URL: {self.agent_kit_url}")
+
+        # Surface the loop implementation so a silent fallback off uvloop
+        # shows up in the logs rather than as a latency regression
+        try:
+            loop_name = type(asyncio.get_running_loop()).__name__
+        except RuntimeError:
+            loop_name = 'none running'
+        logging.info(f"SolanaService event loop: {loop_name}")
         
         self.token_addresses = {
             'SOL': 'So11111111111111111111111111111111111111112',
@@ -47,27 +130,235 @@ class SolanaService:
             'WIF': 'EKpQGSJtjMFqKZ9KQanSqYXRcF8fBopzLHYxdM65zcjm',
             'USDC': 'EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v'
         }
+        # Reverse index so address -> symbol lookups are O(1) dict gets
+        # instead of scans over token_addresses
+        self._address_to_symbol = {
+            address: symbol for symbol, address in self.token_addresses.items()
+        }
+        # Known-token verification results, frozen and built once and
+        # keyed by both symbol and address; the hot paths return these
+        # references instead of allocating an identical dict per call
+        self._known_token_info: Dict[str, Any] = {}
+        for sym, addr in self.token_addresses.items():
+            info = types.MappingProxyType({
+                'symbol': sym,
+                'address': addr,
+                'verified': True,
+                'decimals': 9,
+                'source': 'internal'
+            })
+            self._known_token_info[sym] = info
+            self._known_token_info[addr] = info
+
+        # Static part of every swap's trade params, built once and frozen
+        # like the token-info views above; per-swap fields are merged
+        # over it with a single dict splat, which accepts a mapping proxy
+        sol_mint = self.token_addresses['SOL']
+        self._swap_template = types.MappingProxyType({
+            'inputMint': sol_mint,
+            'tokenIn': sol_mint,
+            'slippageBps': 100
+        })
+
+        # Shared transport for all agent-kit/Jupiter traffic: one pooled
+        # keep-alive session and one concurrency gate. Pass the same
+        # instance to SolanaBridge and both clients reuse one pool.
+        self._transport = transport or AgentKitTransport()
+        self._sem = self._transport.sem
+
+        # Jupiter token-list index, refreshed at most once per TTL; the
+        # lock stops concurrent misses from refetching the multi-MB list
+        self._jupiter_index: Optional[Dict[str, Dict[str, Any]]] = None
+        self._jupiter_index_expiry = 0.0
+        self._jupiter_ttl = int(os.getenv("JUPITER_INDEX_TTL", "300"))
+        self._jupiter_lock = asyncio.Lock()
+
+        # Short-TTL result caches for the hot agent-kit lookups; token
+        # metadata is near-static, prices go stale in seconds
+        self._token_data_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._token_data_ttl = 60
+        self._price_cache: Dict[str, Tuple[float, Decimal]] = {}
+        self._price_ttl = 2.0
+        self._cache_maxsize = 1024
+
+        # Read-through cache over the trading_sessions lookup: sessions
+        # live ~a day, so a short grace window saves a Supabase
+        # round-trip per swap. Maps public_key -> (expiry, success dict)
+        self._session_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._session_cache_ttl = 30.0
+
+        # In-flight coalescer: concurrent identical lookups await one
+        # shared future instead of each issuing their own request
+        self._inflight: Dict[Tuple[str, ...], asyncio.Future] = {}
+
+        # Whether agent-kit supports the fused tradeWithVerification
+        # action; None until probed, False once it reports not_implemented
+        self._fused_trade_supported: Optional[bool] = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Session from the shared transport"""
+        return await self._transport.get_session()
+
+    async def close(self):
+        """Close the shared transport at service shutdown"""
+        await self._transport.close()
+
+    async def _get_jupiter_index(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Symbol and address indexes over the Jupiter token list.
+
+        The full list is fetched at most once per TTL and turned into two
+        dicts, so lookups are O(1) hits instead of an O(N) scan over a
+        freshly downloaded multi-MB response.
+        """
+        if self._jupiter_index is not None and time.monotonic() < self._jupiter_index_expiry:
+            return self._jupiter_index
+
+        async with self._jupiter_lock:
+            # Another waiter may have refreshed while we queued on the lock
+            if self._jupiter_index is not None and time.monotonic() < self._jupiter_index_expiry:
+                return self._jupiter_index
+
+            session = await self._get_session()
+            async with session.get(
+                "https://token.jup.ag/all",
+                timeout=self._TRADE_TIMEOUT  # multi-MB list; read deadline is too tight
+            ) as response:
+                if not response.ok:
+                    # Serve the stale index (or None) rather than failing
+                    return self._jupiter_index
+                if ijson is not None:
+                    # Build both indexes straight off the response stream,
+                    # skipping the intermediate multi-MB token list
+                    by_symbol: Dict[str, Any] = {}
+                    by_address: Dict[str, Any] = {}
+                    async for t in ijson.items(response.content, 'item'):
+                        by_symbol[t['symbol'].upper()] = t
+                        by_address[t['address']] = t
+                    index = {'by_symbol': by_symbol, 'by_address': by_address}
+                else:
+                    token_list = await response.json()
+                    index = {
+                        'by_symbol': {t['symbol'].upper(): t for t in token_list},
+                        'by_address': {t['address']: t for t in token_list},
+                    }
+
+            self._jupiter_index = index
+            self._jupiter_index_expiry = time.monotonic() + self._jupiter_ttl
+            return self._jupiter_index
+
+    def _cache_put(self, cache: Dict[str, Tuple[float, Any]], key: str, value: Any) -> None:
+        """Insert into a TTL cache, evicting the oldest insertion at cap"""
+        if len(cache) >= self._cache_maxsize and key not in cache:
+            cache.pop(next(iter(cache)))
+        cache[key] = (time.monotonic(), value)
+
+    async def _coalesced(self, key: Tuple[str, ...], fetch) -> Any:
+        """Run `fetch` once per key, sharing the result with concurrent callers.
+
+        The first caller for a key registers a future and performs the
+        request; everyone else arriving before it resolves awaits that same
+        future. Errors propagate to all waiters.
+        """
+        fut = self._inflight.get(key)
+        if fut is not None:
+            return await asyncio.shield(fut)
+
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            result = await fetch()
+            fut.set_result(result)
+            return result
+        except Exception as e:
+            fut.set_exception(e)
+            # Mark retrieved so lone failures don't warn at GC time;
+            # waiters still see the exception raised on await
+            fut.exception()
+            raise
+        finally:
+            # Owner cancellation bypasses the except above; cancel the
+            # shared future too or the waiters hang on it forever
+            if not fut.done():
+                fut.cancel()
+            self._inflight.pop(key, None)
+
+    @staticmethod
+    def _wallet_creds(wallet_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Credentials sub-dict, or a shared empty dict when absent"""
+        return wallet_info.get('credentials') or _EMPTY_CREDS
+
+    @staticmethod
+    def _extract_public_key(wallet_info: Dict[str, Any]) -> Optional[str]:
+        """Public key from the top level or credentials, in that order"""
+        return (
+            wallet_info.get('publicKey') or
+            SolanaService._wallet_creds(wallet_info).get('publicKey')
+        )
+
+    @staticmethod
+    def _extract_signature(wallet_info: Dict[str, Any]) -> Optional[str]:
+        """Signature from all known locations, credentials first"""
+        creds = SolanaService._wallet_creds(wallet_info)
+        return (
+            creds.get('signature') or
+            wallet_info.get('signature') or
+            wallet_info.get('sessionSignature') or
+            creds.get('sessionSignature')
+        )
+
+    @staticmethod
+    def _extract_session_id(wallet_info: Dict[str, Any]) -> Optional[str]:
+        """Session ID from the top level or credentials, in that order"""
+        creds = SolanaService._wallet_creds(wallet_info)
+        return (
+            wallet_info.get('sessionId') or
+            creds.get('sessionId') or
+            creds.get('sessionSignature')
+        )
+
+    @staticmethod
+    def _build_init_wallet(
+        public_key: str,
+        signature: str,
+        session_id: str,
+        creds: Dict[str, Any] = None
+    ) -> Dict[str, Any]:
+        """Nested wallet payload for session initialization.
+
+        init_trading_session and _verify_session both post this shape to
+        agent-kit; building it in one place keeps the two in sync. Pass
+        `creds` to carry the caller's sign/connect flags through.
+        """
+        wallet = {
+            'publicKey': public_key,
+            'signature': signature,
+            'sessionId': session_id,
+            'sessionSignature': signature,
+            'credentials': {
+                'publicKey': public_key,
+                'signature': signature,
+                'sessionId': session_id,
+                'sessionSignature': signature
+            }
+        }
+        if creds is not None:
+            wallet['credentials'].update({
+                'signTransaction': creds.get('signTransaction', True),
+                'signAllTransactions': creds.get('signAllTransactions', True),
+                'connected': creds.get('connected', True)
+            })
+        return wallet
 
     async def init_trading_session(self, wallet_info: Dict[str, Any]) -> Dict[str, Any]:
         """Initialize a trading session with agent-kit"""
         try:
-            logging.info(f"Initializing trading session for wallet: {wallet_info}")
-            
-            # Extract credentials from all possible locations with detailed logging
-            public_key = (
-                wallet_info.get('publicKey') or 
-                wallet_info.get('credentials', {}).get('publicKey')
-            )
-            
-            # Try all possible signature locations with fallbacks
-            signature = (
-                wallet_info.get('credentials', {}).get('signature') or  # First try credentials signature
-                wallet_info.get('signature') or  # Then try top level signature
-                wallet_info.get('sessionSignature') or  # Then try session signatures
-                wallet_info.get('credentials', {}).get('sessionSignature')
-            )
-            
-            logging.info(f"Extracted credentials - Public Key: {public_key}, Signature Present: {bool(signature)}")
+            # Extract credentials from all possible locations
+            creds = self._wallet_creds(wallet_info)
+            public_key = self._extract_public_key(wallet_info)
+            signature = self._extract_signature(wallet_info)
+
+            logger.info("Initializing trading session: pk=%s sig=%s",
+                        public_key, _redact(signature))
             
             if not public_key:
                 return {
@@ -79,7 +370,7 @@ class SolanaService:
                     
             if not signature:
                 # Generate session message and ask frontend to sign
-                session_message = f"Trading session initialization for {public_key} at {datetime.now().isoformat()}"
+                session_message = f"Trading session initialization for {public_key} at {fast_iso()}"
                 return {
                     'success': False,
                     'error': 'session_signature_required',
@@ -92,24 +383,13 @@ class SolanaService:
                         
             # Build complete initialization parameters
             init_params = {
-                'wallet': {
-                    'publicKey': public_key,
-                    'signature': signature,      # Keep original signature
-                    'sessionId': session_id,     # Add the session ID
-                    'sessionSignature': signature, # Use original signature as session signature
-                    'credentials': {
-                        'publicKey': public_key,
-                        'signature': signature,  # Keep original signature
-                        'sessionId': session_id,  # Add the session ID
-                        'sessionSignature': signature,  # Use original signature as session signature
-                        'signTransaction': wallet_info.get('credentials', {}).get('signTransaction', True),
-                        'signAllTransactions': wallet_info.get('credentials', {}).get('signAllTransactions', True),
-                        'connected': wallet_info.get('credentials', {}).get('connected', True)
-                    }
-                }
+                'wallet': self._build_init_wallet(
+                    public_key, signature, session_id, creds
+                )
             }
                 
-            logging.info(f"Initializing session with params: {init_params}")
+            logger.info("Initializing session: pk=%s session=%s",
+                        public_key, _redact(session_id))
             
             # Store session in Supabase
             session_data = {
@@ -156,23 +436,21 @@ class SolanaService:
         """Verify and initialize trading session"""
         try:
             # Extract credentials
-            public_key = wallet_info.get('publicKey') or wallet_info.get('credentials', {}).get('publicKey')
-            
+            creds = self._wallet_creds(wallet_info)
+            public_key = self._extract_public_key(wallet_info)
+
             # First try to get session ID
-            session_id = (
-                wallet_info.get('sessionId') or
-                wallet_info.get('credentials', {}).get('sessionId') or
-                wallet_info.get('credentials', {}).get('sessionSignature')
-            )
-            
+            session_id = self._extract_session_id(wallet_info)
+
             # Only fall back to signature if no session ID found
             if not session_id:
                 logging.info("No session ID found, falling back to signature")
                 session_id = (
-                    wallet_info.get('credentials', {}).get('signature') or
+                    creds.get('signature') or
                     wallet_info.get('signature')
                 )
-                logging.info(f"Using fallback signature as session ID: {session_id}")
+                logger.info("Using fallback signature as session ID: %s",
+                            _redact(session_id))
 
             if not public_key or not session_id:
                 return {
@@ -181,9 +459,18 @@ class SolanaService:
                     'code': 'MISSING_CREDENTIALS'
                 }
 
-            # Check existing session
-            current_time = datetime.now().isoformat()
-            
+            # Check existing session (fast_iso: this runs on every swap)
+            current_time = fast_iso()
+
+            # Serve from the read-through cache while both the cache
+            # entry and the underlying session are still valid
+            cached = self._session_cache.get(public_key)
+            if cached is not None:
+                expiry, session_info = cached
+                if time.monotonic() < expiry and session_info['expiresAt'] > current_time:
+                    return session_info
+                self._session_cache.pop(public_key, None)
+
             success, result = await safe_supabase_execute(
                 self.supabase.table('trading_sessions')
                     .select('*')
@@ -202,24 +489,22 @@ class SolanaService:
 
             if result and len(result) > 0:
                 session = result[0]
-                return {
+                session_info = {
                     'success': True,
                     'sessionId': session['signature'],
                     'expiresAt': session['expires_at']
                 }
+                self._session_cache[public_key] = (
+                    time.monotonic() + self._session_cache_ttl, session_info
+                )
+                return session_info
 
             # Initialize new session with agent-kit
             logging.info("No active session found, initializing new session")
             session_result = await self._call_agent_kit('initSession', {
-                'wallet': {
-                    'publicKey': public_key,
-                    'signature': session_id,  # Use the session_id we found earlier
-                    'credentials': {
-                        'publicKey': public_key,
-                        'signature': session_id,  # Use the session_id here too
-                        'sessionId': session_id  # Add this to maintain consistency
-                    }
-                }
+                # session_id doubles as the signature here, matching the
+                # previous inline payload
+                'wallet': self._build_init_wallet(public_key, session_id, session_id)
             })
 
             if not session_result.get('success'):
@@ -228,12 +513,16 @@ class SolanaService:
                     'error': session_result.get('error', 'Session initialization failed')
                 }
 
-            # Store new session
+            # Store new session; convert the expiry timestamp once and
+            # reuse it for both the row and the cache entry
+            expires_at_iso = datetime.fromtimestamp(
+                session_result['expiresAt'] / 1000
+            ).isoformat()
             success, store_result = await safe_supabase_execute(
                 self.supabase.table('trading_sessions').upsert({
                     'public_key': public_key,
                     'signature': session_result['sessionId'],
-                    'expires_at': datetime.fromtimestamp(session_result['expiresAt'] / 1000).isoformat(),
+                    'expires_at': expires_at_iso,
                     'is_active': True,
                     'wallet_data': wallet_info
                 }),
@@ -243,6 +532,14 @@ class SolanaService:
             if not success:
                 logging.warning(f"Failed to store session (continuing): {store_result}")
 
+            self._session_cache[public_key] = (
+                time.monotonic() + self._session_cache_ttl,
+                {
+                    'success': True,
+                    'sessionId': session_result['sessionId'],
+                    'expiresAt': expires_at_iso
+                }
+            )
             return {
                 'success': True,
                 'sessionId': session_result['sessionId'],
@@ -258,51 +555,102 @@ class SolanaService:
 
     async def _verify_token(self, asset: str) -> Dict[str, Any]:
         """Verify and get token information using Jupiter's token list via agent-kit"""
+        return await self._coalesced(
+            ('verify_token', asset),
+            partial(self._verify_token_uncoalesced, asset)
+        )
+
+    async def _verify_token_uncoalesced(self, asset: str) -> Dict[str, Any]:
         try:
-            # First check our known tokens for quick lookup
+            # Known address passed directly: check before any case change,
+            # since mint addresses are case-sensitive and upper() would
+            # corrupt them for lookup
+            if info := self._known_token_info.get(asset):
+                return info
+
+            # Then check our known tokens by symbol
             upper_asset = asset.upper()
-            if token_address := self.token_addresses.get(upper_asset):
-                return {
-                    'symbol': upper_asset,
-                    'address': token_address,
-                    'verified': True,
-                    'decimals': 9,
-                    'source': 'internal'
-                }
+            if info := self._known_token_info.get(upper_asset):
+                return info
+
+            # Hot tokens already in the cached Jupiter index skip the
+            # agent-kit round-trip entirely (no fetch is triggered here)
+            if self._jupiter_index is not None and time.monotonic() < self._jupiter_index_expiry:
+                token = (
+                    self._jupiter_index['by_address'].get(asset) or
+                    self._jupiter_index['by_symbol'].get(upper_asset)
+                )
+                if token:
+                    return {
+                        'symbol': token['symbol'],
+                        'address': token['address'],
+                        'verified': True,
+                        'decimals': token.get('decimals', 9),
+                        'source': 'jupiter_cache'
+                    }
 
             # Try Jupiter API through agent-kit
             try:
-                # If it looks like an address, try address lookup first
-                if len(asset) == 44:
-                    params = {'mint': asset}
-                    token_data = await self._call_agent_kit('getTokenData', params)
+                # When the input could be an address, the address and
+                # symbol probes are independent: race them and take the
+                # first success instead of paying two serial round-trips
+                if _is_valid_mint(asset):
+                    addr_task = asyncio.create_task(
+                        self._call_agent_kit('getTokenData', {'mint': asset})
+                    )
+                    sym_task = asyncio.create_task(
+                        self._call_agent_kit('getTokenData', {'symbol': asset, 'discover': True})
+                    )
+                    pending = {addr_task, sym_task}
+                    try:
+                        while pending:
+                            done, pending = await asyncio.wait(
+                                pending, return_when=asyncio.FIRST_COMPLETED
+                            )
+                            for task in done:
+                                try:
+                                    token_data = task.result()
+                                except Exception:
+                                    continue
+                                if not (token_data and token_data.get('success')):
+                                    continue
+                                data = token_data.get('data', {})
+                                if task is addr_task:
+                                    return {
+                                        'symbol': data.get('symbol', asset[:8]),
+                                        'address': asset,
+                                        'verified': True,
+                                        'decimals': data.get('decimals', 9),
+                                        'source': 'jupiter_address'
+                                    }
+                                return {
+                                    'symbol': data.get('symbol', asset),
+                                    'address': data.get('address'),
+                                    'verified': True,
+                                    'decimals': data.get('decimals', 9),
+                                    'source': 'jupiter_symbol'
+                                }
+                    finally:
+                        for task in pending:
+                            task.cancel()
+                else:
+                    # Symbol-only input: a single discovery lookup
+                    token_data = await self._call_agent_kit('getTokenData', {
+                        'symbol': asset,
+                        'discover': True  # Enable Jupiter discovery
+                    })
                     if token_data and token_data.get('success'):
+                        data = token_data.get('data', {})
                         return {
-                            'symbol': token_data.get('data', {}).get('symbol', asset[:8]),
-                            'address': asset,
+                            'symbol': data.get('symbol', asset),
+                            'address': data.get('address'),
                             'verified': True,
-                            'decimals': token_data.get('data', {}).get('decimals', 9),
-                            'source': 'jupiter_address'
+                            'decimals': data.get('decimals', 9),
+                            'source': 'jupiter_symbol'
                         }
 
-                # Try symbol lookup
-                params = {
-                    'symbol': asset,
-                    'discover': True  # Enable Jupiter discovery
-                }
-                token_data = await self._call_agent_kit('getTokenData', params)
-                if token_data and token_data.get('success'):
-                    data = token_data.get('data', {})
-                    return {
-                        'symbol': data.get('symbol', asset),
-                        'address': data.get('address'),
-                        'verified': True,
-                        'decimals': data.get('decimals', 9),
-                        'source': 'jupiter_symbol'
-                    }
-
-                # If symbol lookup failed but it's an address, return unverified
-                if len(asset) == 44:
+                # If the lookups failed but it's an address, return unverified
+                if _is_valid_mint(asset):
                     logging.warning(f"Token {asset} not found in Jupiter, proceeding as unverified address")
                     return {
                         'symbol': asset[:8],
@@ -322,13 +670,34 @@ class SolanaService:
             logging.error(f"Token verification error: {str(e)}")
             raise
 
-    async def _call_agent_kit(self, action: str, params: Dict[str, Any], headers: Dict[str, str] = None) -> Dict[str, Any]:
-        """Make a request to the agent-kit API"""
+    async def _call_agent_kit(self, action: str, params: Dict[str, Any], headers: Dict[str, str] = None, parse_float=None) -> Dict[str, Any]:
+        """Make a request to the agent-kit API.
+
+        Identical in-flight requests for idempotent read actions are
+        coalesced onto one HTTP round-trip; trade-type actions always go
+        out individually. `parse_float` (e.g. Decimal) decodes JSON
+        numbers directly into that type, skipping the float -> str ->
+        Decimal detour callers would otherwise pay for precision-
+        sensitive fields.
+        """
+        if action in self._RETRYABLE_ACTIONS and headers is None:
+            key = (
+                action,
+                json.dumps(params, sort_keys=True, default=str),
+                parse_float.__name__ if parse_float is not None else ''
+            )
+            return await self._coalesced(
+                key,
+                partial(self._call_agent_kit_direct, action, params,
+                        headers, parse_float)
+            )
+        return await self._call_agent_kit_direct(action, params, headers, parse_float)
+
+    async def _call_agent_kit_direct(self, action: str, params: Dict[str, Any], headers: Dict[str, str] = None, parse_float=None) -> Dict[str, Any]:
+        """The uncoalesced agent-kit request behind _call_agent_kit"""
         try:
-            headers = headers or {
-                'Content-Type': 'application/json'
-            }
-            
+            headers = headers or dict(_JSON_HEADERS)
+
             # If headers already contain session info, don't override it
             if (action == 'trade' and
                 'X-Trading-Session' not in headers and
@@ -342,19 +711,20 @@ class SolanaService:
                 session_id = params.get('sessionId')
                 
                 # If no sessionId in params, check wallet info
+                creds = self._wallet_creds(wallet_info)
                 if not session_id:
                     session_id = (
                         wallet_info.get('sessionId') or
-                        wallet_info.get('credentials', {}).get('sessionSignature')
+                        creds.get('sessionSignature')
                     )
-                    
+
                 # Only use signature as last resort
                 if not session_id:
                     session_id = (
                         wallet_info.get('signature') or
-                        wallet_info.get('credentials', {}).get('signature')
+                        creds.get('signature')
                     )
-                
+
                 if session_id:
                     headers['X-Trading-Session'] = session_id
                     # Update wallet info with consistent session ID
@@ -362,7 +732,7 @@ class SolanaService:
                     wallet_info['signature'] = session_id
                     if 'credentials' in wallet_info:
                         wallet_info['credentials'] = {
-                            **wallet_info.get('credentials', {}),
+                            **creds,
                             'signature': session_id,
                             'sessionSignature': session_id
                         }
@@ -371,35 +741,56 @@ class SolanaService:
                     trade_params['sessionId'] = session_id
                     params = trade_params
                     
-                    logging.info(f"Using session ID for trade: {session_id}")
+                    logger.debug("Using session ID for trade: %s", _redact(session_id))
                 else:
                     logging.warning("No session ID found for trade request")
 
-            logging.info(f"Making request to {self.agent_kit_url}")
-            logging.info(f"Request payload: action={action}, params={params}")
-            logging.info(f"Request headers: {headers}")
-
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    self.agent_kit_url,
-                    json={
-                        'action': action,
-                        'params': params
-                    },
-                    headers=headers
-                ) as response:
-                    logging.info(f"Response status: {response.status}")
-                    logging.info(f"Response headers: {dict(response.headers)}")
-                    
-                    content_type = response.headers.get('Content-Type', '')
-                    if response.status != 200 or 'application/json' not in content_type.lower():
-                        error_text = await response.text()
-                        logging.error(f"Error response: {error_text}")
-                        raise ValueError(f"API error: status={response.status}, content-type={content_type}, body={error_text}")
-                    
-                    data = await response.json()
-                    logging.info(f"Response data: {data}")
-                    return data
+            # Request/response dumps are debug-only with lazy %s
+            # formatting, so disabled levels skip the rendering entirely
+            logger.debug("Making request to %s", self.agent_kit_url)
+            logger.debug("Request payload: action=%s params=%s", action, params)
+            logger.debug("Request headers: %s", headers)
+
+            body = dumps_bytes({
+                'action': action,
+                'params': params
+            })
+            timeout = (
+                self._TRADE_TIMEOUT if action in self._TRADE_ACTIONS
+                else self._READ_TIMEOUT
+            )
+            session = await self._get_session()
+            for attempt in range(2):
+                try:
+                    async with self._sem, session.post(
+                        self.agent_kit_url,
+                        data=body,
+                        headers=headers,
+                        timeout=timeout
+                    ) as response:
+                        logger.debug("Response status: %s", response.status)
+                        if logger.isEnabledFor(logging.DEBUG):
+                            # dict() copy of the headers only when emitted
+                            logger.debug("Response headers: %s", dict(response.headers))
+
+                        content_type = response.headers.get('Content-Type', '')
+                        if response.status != 200 or 'application/json' not in content_type.lower():
+                            error_text = await response.text()
+                            logging.error(f"Error response: {error_text}")
+                            raise ValueError(f"API error: status={response.status}, content-type={content_type}, body={error_text}")
+
+                        if parse_float is not None:
+                            data = json.loads(await response.text(), parse_float=parse_float)
+                        else:
+                            data = loads(await response.read())
+                        logger.debug("Response data: %s", data)
+                        return data
+                except asyncio.TimeoutError:
+                    # Retry idempotent reads once with a short backoff;
+                    # never re-fire trade-type actions automatically
+                    if attempt or action not in self._RETRYABLE_ACTIONS:
+                        raise
+                    await asyncio.sleep(0.05 * 2 ** attempt)
 
         except Exception as e:
             logging.error(f"Agent-kit API call error: {str(e)}")
@@ -407,35 +798,51 @@ class SolanaService:
 
     async def execute_swap(self, params: Dict[str, Any]) -> Dict[str, Any]:
         try:
+            # Preferred path: one fused agent-kit round-trip that verifies
+            # the session and token server-side and executes the trade.
+            # Falls through to the 3-step path when unsupported.
+            if self._fused_trade_supported is not False:
+                fused = await self._try_fused_trade(params)
+                if fused is not None:
+                    return fused
+
             # Get original signature FIRST and keep it separate
+            wallet = params['wallet']
+            creds = self._wallet_creds(wallet)
             original_signature = (
-                params['wallet'].get('credentials', {}).get('signature') or
-                params['wallet'].get('signature')
+                creds.get('signature') or
+                wallet.get('signature')
             )
 
-            logging.info(f"Original signature retrieved: {original_signature}")
-            
+            logger.info("Original signature retrieved: %s", _redact(original_signature))
+
             # Store original session ID if it exists
-            original_session_id = (
-                params['wallet'].get('sessionId') or
-                params['wallet'].get('credentials', {}).get('sessionId') or
-                params['wallet'].get('credentials', {}).get('sessionSignature')
-            )
-            
+            original_session_id = self._extract_session_id(wallet)
+
             if original_session_id:
-                logging.info(f"Found original session ID: {original_session_id}")
+                logger.info("Found original session ID: %s", _redact(original_session_id))
 
-            # Session verification BEFORE anything else
-            session_result = await self._verify_session(params['wallet'])
-            if not session_result.get('success'):
-                # Session invalid or expired, try to initialize a new one
-                session_result = await self.init_trading_session(params['wallet'])
+            # Token verification is independent of the session check, so
+            # start it now and overlap the two round-trips
+            token_task = asyncio.create_task(self._verify_token(params['asset']))
+
+            # Session verification BEFORE anything else; cancel the token
+            # lookup on any bail-out so it can't outlive the swap attempt
+            try:
+                session_result = await self._verify_session(params['wallet'])
                 if not session_result.get('success'):
-                    return session_result
+                    # Session invalid or expired, try to initialize a new one
+                    session_result = await self.init_trading_session(params['wallet'])
+                    if not session_result.get('success'):
+                        token_task.cancel()
+                        return session_result
+            except Exception:
+                token_task.cancel()
+                raise
 
             # Get the current valid session ID - prioritize original session if valid
             session_id = original_session_id if original_session_id else session_result['sessionId']
-            logging.info(f"Using verified session ID for swap: {session_id}")
+            logger.info("Using verified session ID for swap: %s", _redact(session_id))
 
             # Update the wallet credentials with both session ID and original signature
             wallet_with_session = {
@@ -453,10 +860,11 @@ class SolanaService:
                 }
             }
 
-            logging.info(f"Prepared wallet with session: {wallet_with_session}")
+            logger.debug("Prepared wallet with session for pk=%s",
+                         wallet_with_session['publicKey'])
 
-            # Verify token
-            token_info = await self._verify_token(params['asset'])
+            # Collect the token verification started above
+            token_info = await token_task
             if not token_info.get('address'):
                 return {
                     'success': False,
@@ -464,14 +872,12 @@ class SolanaService:
                     'user_message': 'Token not found'
                 }
 
-            # Build trade params with verified session
+            # Build trade params with verified session over the template
             trade_params = {
+                **self._swap_template,
                 'outputMint': token_info['address'],
                 'inputAmount': float(params['amount']),
-                'inputMint': self.token_addresses['SOL'],
-                'tokenIn': self.token_addresses['SOL'],
                 'tokenOut': token_info['address'],
-                'slippageBps': 100,
                 'token_data': token_info,
                 'wallet': wallet_with_session,  # Use the updated wallet info
                 'sessionId': session_id,  # Add session ID
@@ -487,7 +893,8 @@ class SolanaService:
             }
 
             # Log the final request details
-            logging.info(f"Making trade request with session ID: {session_id} and signature: {original_signature}")
+            logger.debug("Making trade request: session=%s sig=%s",
+                         _redact(session_id), _redact(original_signature))
             
             result = await self._call_agent_kit('trade', trade_params, headers)
             return result
@@ -500,60 +907,121 @@ class SolanaService:
                 'user_message': 'Trading error occurred. Please try again.'
             }
 
+    async def _try_fused_trade(self, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Attempt the single-round-trip tradeWithVerification action.
+
+        Bundles session verification, token verification and the trade
+        into one agent-kit call, saving two network round-trips per swap.
+        Returns None only when there is evidence the frontend does not
+        implement the action, signalling the caller to use the 3-step
+        path. Timeouts and server errors propagate instead: the trade
+        may have executed server-side, and falling through would submit
+        it a second time.
+        """
+        try:
+            result = await self._call_agent_kit('tradeWithVerification', {
+                **self._swap_template,
+                'asset': params['asset'],
+                'inputAmount': float(params['amount']),
+                'wallet': params['wallet']
+            })
+        except aiohttp.ClientConnectionError as e:
+            # Nothing reached the frontend, so the 3-step path is safe
+            logging.debug(f"tradeWithVerification probe refused, using 3-step path: {e}")
+            return None
+        except ValueError as e:
+            # Unknown-action rejections (404/400) mean the trade did not
+            # run; anything else may have, and is never re-fired
+            msg = str(e)
+            if 'status=404' in msg or 'status=400' in msg:
+                logging.debug(f"tradeWithVerification not available, using 3-step path: {e}")
+                self._fused_trade_supported = False
+                return None
+            raise
+
+        if result.get('error') == 'not_implemented' or result.get('code') == 'not_implemented':
+            # Remember so later swaps skip the probe entirely
+            self._fused_trade_supported = False
+            return None
+
+        if result.get('success'):
+            self._fused_trade_supported = True
+            return result
+
+        # Unrecognized failure body (e.g. an unknown-action reply that
+        # doesn't use the not_implemented code): the frontend answered
+        # without executing a trade, so the 3-step path is safe. Don't
+        # latch support either way — keep probing on later swaps.
+        logging.debug(f"tradeWithVerification returned failure, using 3-step path: {result}")
+        return None
+
     async def get_token_data(self, token_address: str) -> Dict[str, Any]:
-        """Get token data through agent-kit"""
-        return await self._call_agent_kit('getTokenData', {'mint': token_address})
+        """Get token data through agent-kit (cached; metadata is near-static)"""
+        cached = self._token_data_cache.get(token_address)
+        now = time.monotonic()
+        if cached is not None and now - cached[0] < self._token_data_ttl:
+            return cached[1]
+
+        data = await self._coalesced(
+            ('token_data', token_address),
+            partial(self._call_agent_kit, 'getTokenData', {'mint': token_address})
+        )
+        self._cache_put(self._token_data_cache, token_address, data)
+        return data
 
     async def get_token_price(self, token: str) -> Decimal:
-        """Get token price through agent-kit"""
-        result = await self._call_agent_kit('getPrice', {
-            'mint': self.token_addresses.get(token.upper(), token)
-        })
-        return Decimal(str(result.get('price', 0)))
+        """Get token price through agent-kit (cached for a couple of seconds)"""
+        mint = self.token_addresses.get(token.upper(), token)
+        cached = self._price_cache.get(mint)
+        now = time.monotonic()
+        if cached is not None and now - cached[0] < self._price_ttl:
+            return cached[1]
+
+        result = await self._coalesced(
+            ('price', mint),
+            partial(self._call_agent_kit, 'getPrice', {'mint': mint},
+                    parse_float=Decimal)
+        )
+        price = result.get('price', 0)
+        if not isinstance(price, Decimal):
+            price = Decimal(price)  # ints decode as int, not Decimal
+        self._cache_put(self._price_cache, mint, price)
+        return price
+
+    async def get_token_price_f(self, token: str) -> float:
+        """Float token price for callers that only compare or multiply"""
+        return float(await self.get_token_price(token))
 
     async def get_token_info(self, symbol_or_address: str) -> Dict[str, Any]:
         """Dynamically get token info from Jupiter API or on-chain"""
         try:
-            # Check known tokens first (IMPORTANT: Check before doing any uppercase)
-            if symbol_or_address.upper() in self.token_addresses:
-                return {
-                    'symbol': symbol_or_address.upper(),
-                    'address': self.token_addresses[symbol_or_address.upper()],
-                    'verified': True,
-                    'decimals': 9  # Default decimals for known tokens
-                }
+            # Check known tokens first, by exact address then by symbol
+            # (address before any uppercase — mints are case-sensitive)
+            upper = symbol_or_address.upper()
+            info = (
+                self._known_token_info.get(symbol_or_address) or
+                self._known_token_info.get(upper)
+            )
+            if info:
+                return info
 
-            # If it's an exact address match in token_addresses values
-            for symbol, address in self.token_addresses.items():
-                if symbol_or_address == address:
+            # Try the cached Jupiter token index
+            index = await self._get_jupiter_index()
+            if index is not None:
+                token = (
+                    index['by_symbol'].get(upper) or
+                    index['by_address'].get(symbol_or_address)
+                )
+                if token:
                     return {
-                        'symbol': symbol,
-                        'address': address,
+                        'symbol': token['symbol'],
+                        'address': token['address'],
                         'verified': True,
-                        'decimals': 9
+                        'decimals': token.get('decimals', 9)
                     }
 
-            # Try Jupiter token list
-            jupiter_url = "https://token.jup.ag/all"
-            async with aiohttp.ClientSession() as session:
-                async with session.get(jupiter_url) as response:
-                    if response.ok:
-                        token_list = await response.json()
-                        # Look for exact matches first
-                        token = next((t for t in token_list 
-                            if t['symbol'].upper() == symbol_or_address.upper() or 
-                            t['address'] == symbol_or_address), None)
-                        
-                        if token:
-                            return {
-                                'symbol': token['symbol'],
-                                'address': token['address'],
-                                'verified': True,
-                                'decimals': token.get('decimals', 9)
-                            }
-
             # If it looks like an address, treat as unverified token
-            if len(symbol_or_address) == 44:
+            if _is_valid_mint(symbol_or_address):
                 return {
                     'symbol': symbol_or_address[:8],  # Short version of address
                     'address': symbol_or_address,
@@ -579,7 +1047,7 @@ class SolanaService:
     async def _store_session(self, wallet_info: Dict[str, Any], session_result: Dict[str, Any]) -> None:
         """Store the session information in Supabase"""
         try:
-            public_key = wallet_info.get('publicKey') or wallet_info.get('credentials', {}).get('publicKey')
+            public_key = self._extract_public_key(wallet_info)
             session_id = session_result.get('sessionId')
             
             if not public_key or not session_id:
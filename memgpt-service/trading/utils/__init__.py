@@ -3,4 +3,7 @@ from .indicators import (
     calculate_bollinger_bands,
     calculate_rsi,
     calculate_macd
-) 
\ No newline at end of file
+)
+from .timeutils import fast_iso
+from .numutils import parse_decimal
+from .jsonutils import dumps_bytes, dumps_str, json_default, loads
\ No newline at end of file
@@ -0,0 +1,56 @@
+# memgpt-service/trading/utils/jsonutils.py
+import json
+import types
+from datetime import datetime
+from decimal import Decimal
+
+import numpy as np
+
+try:
+    import orjson
+    _ORJSON_OPTS = orjson.OPT_SERIALIZE_NUMPY
+except ImportError:
+    orjson = None
+    _ORJSON_OPTS = 0
+
+
+def json_default(obj):
+    """Fallback encoder for Decimal/datetime/numpy payload values"""
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, (np.floating, np.integer)):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, types.MappingProxyType):
+        return dict(obj)  # frozen token-info views embedded in payloads
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_bytes(payload) -> bytes:
+    """Serialize a payload to JSON bytes, via orjson when installed.
+
+    Suited to aiohttp `data=` bodies, which want bytes anyway — skips the
+    decode/encode round-trip dumps_str would pay.
+    """
+    if orjson is not None:
+        return orjson.dumps(payload, default=json_default, option=_ORJSON_OPTS)
+    return json.dumps(payload, default=json_default).encode()
+
+
+def dumps_str(payload) -> str:
+    """Serialize a payload to a JSON string, via orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(
+            payload, default=json_default, option=_ORJSON_OPTS
+        ).decode()
+    return json.dumps(payload, default=json_default)
+
+
+def loads(raw):
+    """Parse JSON from str/bytes, via orjson when installed"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
@@ -0,0 +1,19 @@
+# memgpt-service/trading/utils/numutils.py
+from decimal import Decimal
+
+_ZERO = Decimal(0)
+
+
+def parse_decimal(value) -> Decimal:
+    """Convert a price/size-like value to Decimal without redundant parsing.
+
+    Decimal passes through untouched and int/str convert directly; only
+    float pays the str round-trip needed for an exact representation.
+    """
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, (int, str)):
+        return Decimal(value)
+    if value is None:
+        return _ZERO
+    return Decimal(str(value))
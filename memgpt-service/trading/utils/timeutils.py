@@ -0,0 +1,27 @@
+# memgpt-service/trading/utils/timeutils.py
+import time
+from datetime import datetime
+
+# Cache the "YYYY-MM-DDTHH:MM:SS" prefix per whole second; only the
+# microsecond suffix is formatted on each call.
+_last_second = 0
+_last_prefix = ""
+
+
+def fast_iso(ns: int = None) -> str:
+    """ISO-8601 timestamp equivalent to datetime.now().isoformat().
+
+    Memoizes the per-second prefix so hot paths skip building a datetime
+    object and re-formatting the full string on every call.
+    """
+    global _last_second, _last_prefix
+
+    if ns is None:
+        ns = time.time_ns()
+
+    second, remainder_ns = divmod(ns, 1_000_000_000)
+    if second != _last_second or not _last_prefix:
+        _last_prefix = datetime.fromtimestamp(second).isoformat()
+        _last_second = second
+
+    return f"{_last_prefix}.{remainder_ns // 1000:06d}"
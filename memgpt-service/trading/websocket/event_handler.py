@@ -7,6 +7,7 @@ from datetime import datetime, timedelta
 import logging
 from dataclasses import dataclass, asdict
 from fastapi import WebSocket, WebSocketDisconnect
+from ..utils.jsonutils import dumps_str
 
 @dataclass
 class WSClient:
@@ -213,9 +214,11 @@ class WebSocketEventHandler:
     async def _broadcast_to_channel(self, channel: str, message: Dict[str, Any]):
         """Broadcast message to all clients subscribed to a channel"""
         if channel in self.channels:
+            # Serialize once for the whole channel instead of per client
+            payload = dumps_str(message)
             for client_id in self.channels[channel]:
                 if client_id in self.clients:
-                    await self._send_to_client(client_id, message)
+                    await self._send_payload(client_id, payload)
 
     async def handle_connection(self, websocket: WebSocket, client_id: str):
         """Handle new WebSocket connection"""
@@ -273,10 +276,14 @@ class WebSocketEventHandler:
 
     async def _send_to_client(self, client_id: str, message: Dict[str, Any]):
         """Send message to specific client"""
+        await self._send_payload(client_id, dumps_str(message))
+
+    async def _send_payload(self, client_id: str, payload: str):
+        """Send an already-serialized JSON payload to a specific client"""
         try:
             if client_id in self.websockets:
                 websocket = self.websockets[client_id]
-                await websocket.send_json(message)
+                await websocket.send_text(payload)
         except Exception as e:
             logging.error(f"Error sending to client {client_id}: {str(e)}")
             # Clean up if client is no longer connected